@@ -1,8 +1,13 @@
-from path_util import PathUtil
-import json
-from bs4 import BeautifulSoup
-from typing import Dict, Optional, List
+import io
+import os
+import re
+from html import escape
+from typing import Dict, Optional, List, TextIO
 from member import MemberInfo
+from html_writer import PrettyTemplate, write_empty_element, write_row
+from club_context import ClubContext
+import profiler
+from build_cache import write_if_changed
 from datetime import datetime, timedelta
 
 
@@ -39,7 +44,7 @@ class Session:
             g, y, r = "", "", str(duration)
             d = str(duration)
 
-        self._rows.append(Session.create_row([
+        self._rows.append([
             ("col-time", self._current_time.strftime("%I:%M %p")),
             ("col-role", role_name),
             ("col-event", event),
@@ -48,21 +53,31 @@ class Session:
             ("col-card", g),
             ("col-card", y),
             ("col-card", r),
-        ]))
+        ])
 
         self._current_time += timedelta(minutes=duration)
         return True
 
+    def write(self, stream: TextIO, depth: int):
+        # rows follow the (empty) session div rather than nesting in it, as dump_to_element has always produced
+        write_empty_element(stream, "div", [("class", "session")], depth)
+        if self._title is not None:
+            write_row(stream, [("col-12 head", self._title)], depth)
+        for row in self._rows:
+            write_row(stream, row, depth)
+
     def dump_to_element(self):
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup("<div class=\"session\"></div>", features="html.parser")
         if self._title is not None:
             soup.append(Session.create_row([("col-12 head", self._title)]))
         for row in self._rows:
-            soup.append(row)
+            soup.append(Session.create_row(row))
         return soup
 
     @classmethod
     def create_row(cls, columns):
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(features="html.parser")
         head_row = soup.new_tag("div")
         head_row["class"] = "row"
@@ -81,52 +96,125 @@ class Session:
         return self._current_time
 
 
+class CompiledTemplate:
+    """
+    A template with its localization applied, split into literal segments (even indices) and the names of the
+    placeholders left for each meeting (odd indices).
+    """
+    PLACEHOLDER_PATTERN = re.compile(r"{{(.*?)}}")
+
+    def __init__(self, html_template: str, localization: Dict[str, str]):
+        self._pretty_template = None  # type: Optional[PrettyTemplate]
+        self._segments = [""]  # type: List[str]
+        for i, part in enumerate(self.PLACEHOLDER_PATTERN.split(html_template)):
+            if i % 2 == 0:
+                self._segments[-1] += part
+            elif part in localization:
+                self._segments[-1] += localization[part]
+            else:
+                self._segments += [part, ""]
+
+    def render(self, values: Dict[str, str]) -> str:
+        parts = list(self._segments)
+        for i in range(1, len(parts), 2):
+            key = parts[i]
+            parts[i] = values[key] if key in values else "{{" + key + "}}"
+        return "".join(parts)
+
+    @property
+    def pretty_template(self) -> PrettyTemplate:
+        if self._pretty_template is None:
+            self._pretty_template = PrettyTemplate(self.render({}))
+        return self._pretty_template
+
+
 class Agenda:
     @classmethod
-    def template_localization(cls, template_path, language,
-                              additional_dict: Optional[Dict[str, Dict[str, str]]] = None):
+    def compile_template(cls, club: ClubContext, language, template_name="default.html") -> CompiledTemplate:
+        """
+        :return: the club's template localized to language, compiled once and cached in the club context
+        """
+        template_path = club.path_util.get_template(template_name)
+        template_mtime = os.stat(template_path).st_mtime_ns
+        localization_dict = club.config.get("localization")  # type: Dict[str, Dict[str, str]]
+        cached = club.compiled_templates.get((template_path, language))
+        if cached is not None and cached[0] == template_mtime and cached[1] is localization_dict:
+            return cached[2]
+
         with open(template_path, "r", encoding="utf-8") as html_file:
             html_template = html_file.read()
             html_file.close()
-        with open(PathUtil().get_config_path("localization"), "r", encoding="utf-8") as localization_file:
-            localization_dict = json.load(localization_file)  # type: Dict[str, Dict[str, str]]
-            localization_file.close()
 
+        compiled_template = CompiledTemplate(html_template, {
+            key: v_dict["default"] if language not in v_dict else v_dict[language]
+            for key, v_dict in localization_dict.items()
+        })
+        club.compiled_templates[(template_path, language)] = (template_mtime, localization_dict, compiled_template)
+        return compiled_template
+
+    @classmethod
+    def template_localization(cls, club: ClubContext, language,
+                              additional_dict: Optional[Dict[str, Dict[str, str]]] = None):
+        values = {}  # type: Dict[str, str]
         if additional_dict is not None:
-            localization_dict.update(additional_dict)
-
-        for key, v_dict in localization_dict.items():
-            value = v_dict["default"] if language not in v_dict else v_dict[language]
-            html_template = html_template.replace("{{" + key + "}}", value)
-        return html_template
-
-    def __init__(self, language, theme, speech_count=3):
-        self._template_str = Agenda.template_localization(
-            PathUtil().get_template("default.html"),
-            language,
-            {
-                "theme": {
-                    "default": theme,
-                },
-                "speech_count": {
-                    "default": str(speech_count),
-                }
-            }
-        )
+            for key, v_dict in additional_dict.items():
+                values[key] = v_dict["default"] if language not in v_dict else v_dict[language]
+        return cls.compile_template(club, language).render(values)
+
+    def __init__(self, language, theme, speech_count=3, club=None):
+        """
+        :param club: the club whose template is used, the package directory by default
+        """
+        self._template = Agenda.compile_template(ClubContext.default() if club is None else club, language)
+        self._values = {
+            "theme": theme,
+            "speech_count": str(speech_count)
+        }
         self._sessions = []  # type: List[Session]
 
     def append_session(self, session: Session):
         self._sessions.append(session)
         return session
 
-    def dump(self, output_path):
-        current_soup = BeautifulSoup(self._template_str, features="html.parser")
+    def write(self, stream: TextIO):
+        def write_body(body_stream, depth):
+            for session in self._sessions:
+                session.write(body_stream, depth)
+
+        self._template.pretty_template.write(stream, self._values, write_body)
+
+    def render(self) -> str:
+        stream = io.StringIO()
+        self.write(stream)
+        return stream.getvalue()
+
+    def render_with_bs4(self) -> str:
+        from bs4 import BeautifulSoup
+        # the theme is text, markup in it is shown as typed, as write() does
+        current_soup = BeautifulSoup(
+            self._template.render({key: escape(value) for key, value in self._values.items()}),
+            features="html.parser"
+        )
         body = current_soup.find("div", id="body")
         for session in self._sessions:
             body.append(session.dump_to_element())
-        with open(output_path, "w", encoding="utf-8") as out_file:
-            out_file.write(current_soup.prettify())
-            out_file.close()
+        with profiler.span("prettify"):
+            return current_soup.prettify()
+
+    def dump(self, output_path, use_bs4=False) -> bool:
+        """
+        :param use_bs4: render through BeautifulSoup instead of writing the HTML directly; both give the same bytes,
+            and both escape markup in the theme
+        :return: whether output_path changed, an agenda identical to the one on disk is not rewritten
+        """
+        with profiler.span("Agenda.dump", {"bs4": use_bs4}):
+            if use_bs4:
+                rendered = self.render_with_bs4()
+            else:
+                out_file = io.StringIO()
+                self.write(out_file)
+                rendered = out_file.getvalue()
+            return write_if_changed(output_path, rendered.encode("utf-8"))
 
     @property
     def current_datetime(self):
@@ -134,8 +222,9 @@ class Agenda:
 
 
 def __main__():
+    club = ClubContext.default()
     for language in ["English", "Chinese"]:
-        agenda = Agenda(language, "test theme")
+        agenda = Agenda(language, "test theme", club=club)
         session = Session(datetime(2020, 11, 5, 16, 40))
         session.append_event(
             duration=20,
@@ -197,7 +286,7 @@ def __main__():
         )
         agenda.append_session(session)
 
-        agenda.dump(PathUtil().get_output_path("{}.html".format(language)))
+        agenda.dump(club.path_util.get_output_path("{}.html".format(language)))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,247 @@
+import argparse
+import datetime
+import io
+import json
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from os import path
+from typing import Dict, List
+from member import MemberInfoLibrary
+from club_context import ClubContext
+from toastmaster_generator import ToastmasterAgendaGenerator
+
+
+SYLLABLES = ["an", "bo", "chen", "da", "el", "fa", "gu", "hao", "li", "ma", "na", "pe", "qi", "ro", "sa", "ti",
+             "wu", "xi", "ya", "zh"]
+FUNCTION_ROLES = ["Toastmaster", "GE", "TTM", "TTE", "Timer", "Ah Counter", "Word Smith", "IE"]
+# call role keys of the function roles filled in every synthetic meeting
+MEETING_ROLES = ["TM", "GE", "Timer", "Ah-counter", "Wordsmith", "TTM", "TTE"]
+STAGES = ["load", "find", "read_info_from_call_role", "clear_records", "parse_info", "Meeting.build_agenda",
+          "Agenda.dump", "MemberInfoLibrary.dump"]
+# synthetic records end before this year and meetings are held in it, so clear_records only drops meeting records
+MEETING_YEAR = 2030
+
+
+def _word(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+
+def _wednesdays(first_year: int, last_year: int) -> List[int]:
+    day = datetime.date(first_year, 1, 1)
+    day += datetime.timedelta(days=(2 - day.weekday()) % 7)
+    dates = []
+    while day.year <= last_year:
+        dates.append(int(day.strftime("%Y%m%d")))
+        day += datetime.timedelta(days=7)
+    return dates
+
+
+def synthetic_members(member_count: int, record_count: int, seed=0, club=None) -> List[Dict[str, object]]:
+    """
+    :return: member info json of member_count members with about record_count role and speech records each
+    """
+    rng = random.Random(seed)
+    pathway = (ClubContext.default() if club is None else club).config.get("learning_path")["pathway"]
+    dates = _wednesdays(2000, MEETING_YEAR - 1)
+    members = []
+    english_names = set()
+    for i in range(member_count):
+        english_name = "{} {}".format(_word(rng, 2), _word(rng, 1))
+        if english_name in english_names:
+            english_name = "{} {}".format(english_name, i)
+        english_names.add(english_name)
+        # stay in the first half of the path, so members can still be given speeches in the synthetic meetings
+        speech_count = min(record_count // 10, (len(pathway) - 1) // 2)
+        member_dates = sorted(rng.choice(dates) for _ in range(record_count))
+        speech_dates = sorted(rng.sample(member_dates, speech_count))
+        for date in speech_dates:
+            member_dates.remove(date)
+        role_records = []
+        for date in member_dates:
+            role = rng.choice(FUNCTION_ROLES)
+            record = {"Role": role, "Date": str(date)}
+            if role in ["TTM", "Toastmaster"]:
+                record["Topic"] = _word(rng, 3)
+            role_records.append(record)
+        members.append({
+            "English Name": english_name,
+            "Chinese Name": _word(rng, 2),
+            "Nick Names": [],
+            "Mentor Name": None,
+            "Current Level": pathway[speech_count],
+            "Role Records": role_records,
+            "Speech Records": [{
+                "Level": pathway[j + 1],
+                "Date": str(date),
+                "Topic": _word(rng, 3),
+                "Type": "pathway"
+            } for j, date in enumerate(speech_dates)]
+        })
+    return members
+
+
+def synthetic_call_role(members: List[Dict[str, object]], meeting_count: int, seed=0) -> str:
+    rng = random.Random(seed)
+    dates = _wednesdays(MEETING_YEAR, MEETING_YEAR)[:meeting_count]
+    lines = []
+    for date in dates:
+        takers = rng.sample(members, min(len(members), len(MEETING_ROLES) + 6))
+        names = [taker["English Name"] for taker in takers]
+        lines.append("{}/{} (English) Microsoft Toastmasters Meeting".format(date // 100 % 100, date % 100))
+        lines.append("Theme: {}".format(_word(rng, 3)))
+        for role, name in zip(MEETING_ROLES, names):
+            lines.append("{}: {}".format(role, name))
+        for i in range(1, 4):
+            speaker, evaluator = names[len(MEETING_ROLES) + 2 * i - 2:len(MEETING_ROLES) + 2 * i]
+            lines.append("SP{}: {}".format(i, speaker))
+            lines.append("SPT{}: 7".format(i))
+            lines.append("SP{} Topic: {}".format(i, _word(rng, 3)))
+            lines.append("IE{}: {}".format(i, evaluator))
+        lines.append("NM: 1")
+        lines.append("")
+    return "\n".join(lines)
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}  # type: Dict[str, Dict[str, float]]
+
+    def add(self, stage: str, seconds: float, operations=1):
+        timing = self.stages.setdefault(stage, {"seconds": 0.0, "operations": 0})
+        timing["seconds"] += seconds
+        timing["operations"] += operations
+
+    def time(self, stage: str, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        self.add(stage, time.perf_counter() - start)
+        return result
+
+
+def run_case(member_count: int, record_count: int, meeting_count: int, find_count: int, work_dir: str, seed=0):
+    members = synthetic_members(member_count, record_count, seed)
+    member_info_path = path.join(work_dir, "member_info.json")
+    with open(member_info_path, "w", encoding="utf-8") as member_info_file:
+        json.dump(members, member_info_file, indent=2)
+        member_info_file.close()
+    call_role_text = synthetic_call_role(members, meeting_count, seed)
+
+    timer = StageTimer()
+    member_lib = timer.time("load", MemberInfoLibrary, member_info_path)
+
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(find_count):
+        name = rng.choice(members)["English Name"]
+        queries.append(name[:rng.randint(3, len(name))])
+    start = time.perf_counter()
+    for query in queries:
+        member_lib.find(query)
+    timer.add("find", time.perf_counter() - start, len(queries))
+
+    meetings = timer.time(
+        "read_info_from_call_role", ToastmasterAgendaGenerator.read_info_from_call_role, call_role_text, MEETING_YEAR
+    )
+    agenda_path = path.join(work_dir, "agenda.html")
+    for meeting in meetings:
+        timer.time("clear_records", member_lib.clear_records, meeting.date_str)
+        timer.time("parse_info", meeting.parse_info, member_lib)
+        agenda = timer.time("Meeting.build_agenda", meeting.build_agenda)
+        timer.time("Agenda.dump", agenda.dump, agenda_path)
+    timer.time("MemberInfoLibrary.dump", member_lib.dump, path.join(work_dir, "dumped_member_info.json"))
+    return {
+        "name": "members={} records={} meetings={}".format(member_count, record_count, meeting_count),
+        "members": member_count,
+        "records": record_count,
+        "meetings": meeting_count,
+        "stages": timer.stages
+    }
+
+
+def compare(results: Dict[str, object], baseline: Dict[str, object], threshold: float) -> int:
+    """
+    Print the change of the time per operation of every stage against the baseline.
+    :return: the number of stages slower than the baseline by more than threshold
+    """
+    baseline_cases = {case["name"]: case for case in baseline["cases"]}
+    regressions = 0
+    for case in results["cases"]:
+        if case["name"] not in baseline_cases:
+            print("{}: not in the baseline".format(case["name"]))
+            continue
+        print(case["name"])
+        baseline_stages = baseline_cases[case["name"]]["stages"]
+        for stage, timing in case["stages"].items():
+            if stage not in baseline_stages:
+                continue
+            per_operation = timing["seconds"] / timing["operations"]
+            baseline_timing = baseline_stages[stage]
+            baseline_per_operation = baseline_timing["seconds"] / baseline_timing["operations"]
+            ratio = per_operation / baseline_per_operation if baseline_per_operation > 0 else float("inf")
+            mark = ""
+            if ratio > 1 + threshold:
+                mark = "  REGRESSION"
+                regressions += 1
+            elif ratio < 1 - threshold:
+                mark = "  faster"
+            print("  {:<26}{:>12.3f} ms{:>12.3f} ms{:>8.2f}x{}".format(
+                stage, baseline_per_operation * 1000, per_operation * 1000, ratio, mark))
+    return regressions
+
+
+def __main__():
+    parser = argparse.ArgumentParser(description="time every stage of the agenda pipeline on synthetic clubs")
+    parser.add_argument("--members", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="library sizes to run, up to 100000")
+    parser.add_argument("--records", type=int, default=50, help="records per member, up to 1000")
+    parser.add_argument("--meetings", type=int, default=20, help="meetings in the call role text")
+    parser.add_argument("--finds", type=int, default=1000, help="name lookups timed per library")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown per operation reported as a regression")
+    options = parser.parse_args()
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "cases": []
+    }
+    work_dir = tempfile.mkdtemp(prefix="agenda_benchmark_")
+    try:
+        for member_count in options.members:
+            # the parse output of every meeting would drown the timings
+            with redirect_stdout(io.StringIO()):
+                case = run_case(member_count, options.records, options.meetings, options.finds, work_dir,
+                                options.seed)
+            results["cases"].append(case)
+            print(case["name"])
+            for stage in STAGES:
+                timing = case["stages"][stage]
+                print("  {:<26}{:>10.3f} s total{:>12.3f} ms/op".format(
+                    stage, timing["seconds"], timing["seconds"] / timing["operations"] * 1000))
+    finally:
+        shutil.rmtree(work_dir)
+
+    if options.output is not None:
+        with open(options.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+            output_file.close()
+    if options.baseline is not None:
+        with open(options.baseline, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+            baseline_file.close()
+        print("\ncompared with {} (baseline ms/op, current ms/op)".format(options.baseline))
+        if compare(results, baseline, options.threshold) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    __main__()
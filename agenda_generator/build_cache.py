@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from os import path
+from typing import Dict, Iterable, List, Optional
+
+
+def write_if_changed(file_path: str, content: bytes) -> bool:
+    """
+    Atomically replace file_path with content unless it already holds exactly these bytes.
+    :return: whether the file was written
+    """
+    if path.exists(file_path):
+        with open(file_path, "rb") as existing_file:
+            unchanged = existing_file.read() == content
+            existing_file.close()
+        if unchanged:
+            return False
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "wb") as temp_file:
+        temp_file.write(content)
+        temp_file.close()
+    os.replace(temp_path, file_path)
+    return True
+
+
+def copy_if_changed(source_path: str, target_path: str) -> bool:
+    with open(source_path, "rb") as source_file:
+        content = source_file.read()
+        source_file.close()
+    return write_if_changed(target_path, content)
+
+
+def file_digest(file_path: str) -> Optional[str]:
+    if not path.exists(file_path):
+        return None
+    with open(file_path, "rb") as hashed_file:
+        digest = hashlib.sha1(hashed_file.read()).hexdigest()
+        hashed_file.close()
+    return digest
+
+
+def digest_of(value) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class BuildCache:
+    """
+    Remembers, per meeting date, the fingerprint of everything a meeting's outputs are made from, the records the
+    meeting left in the member library and the digests of the files it wrote. A meeting whose fingerprint, records
+    and files all still match needs no work at all.
+    """
+    def __init__(self, cache_path: str, base_dir: str):
+        self._cache_path = cache_path
+        self._base_dir = base_dir
+        self._entries = {}  # type: Dict[str, Dict[str, object]]
+        if path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as cache_file:
+                self._entries = json.load(cache_file)
+                cache_file.close()
+        self._changed = False
+
+    @classmethod
+    def files_digest(cls, file_paths: Iterable[str]) -> str:
+        return digest_of([[path.basename(file_path), file_digest(file_path)] for file_path in file_paths])
+
+    def is_fresh(self, date_str: str, fingerprint: str, state: str) -> bool:
+        entry = self._entries.get(date_str)
+        if entry is None or entry["Fingerprint"] != fingerprint or entry["State"] != state:
+            return False
+        return all(
+            file_digest(path.join(self._base_dir, relative_path)) == digest
+            for relative_path, digest in entry["Outputs"].items()
+        )
+
+    def record(self, date_str: str, fingerprint: str, state: str, output_paths: List[str]):
+        entry = {
+            "Fingerprint": fingerprint,
+            "State": state,
+            "Outputs": {
+                path.relpath(output_path, self._base_dir).replace(os.sep, "/"): file_digest(output_path)
+                for output_path in output_paths
+            }
+        }
+        if self._entries.get(date_str) != entry:
+            self._entries[date_str] = entry
+            self._changed = True
+
+    def save(self) -> bool:
+        if not self._changed:
+            return False
+        self._changed = False
+        return write_if_changed(
+            self._cache_path, json.dumps(self._entries, indent=2, sort_keys=True).encode("utf-8")
+        )
@@ -0,0 +1,54 @@
+import re
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+
+MEETING_HEADER_PATTERN = re.compile(r"^([0-9]+)/([0-9]+)")
+NAME_NOISE_PATTERN = re.compile(r"[\ud83c\ufe0f\udf3f\u5973\u795e\u7537\ud83d\udf38\udf3b]|(\[.*])|(N/A)")
+
+
+class CallRoleError(ValueError):
+    def __init__(self, source_name: str, line_number: int, message: str):
+        super().__init__("{}:{}: {}".format(source_name, line_number, message))
+        self.source_name = source_name
+        self.line_number = line_number
+
+
+class MeetingRecord:
+    """
+    Raw information of one meeting block in a call role text, before any member or config lookup.
+    """
+    def __init__(self, month: int, day: int, line_number: int):
+        self.month = month
+        self.day = day
+        self.line_number = line_number
+        self.info = {}  # type: Dict[str, str]
+        self.skipped_events = set()  # type: Set[str]
+
+
+def strip_name(member_name: str) -> str:
+    return NAME_NOISE_PATTERN.sub("", member_name).strip()
+
+
+def parse_call_role(lines: Iterable[str], source_name="<call role>") -> Iterator[MeetingRecord]:
+    """
+    Lazily parse call role lines, e.g. an open file, yielding each meeting as soon as its block ends.
+    """
+    meeting = None  # type: Optional[MeetingRecord]
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip("\n").replace("：", ":")
+        m = MEETING_HEADER_PATTERN.match(line)
+        if m is not None:
+            if meeting is not None:
+                yield meeting
+            meeting = MeetingRecord(int(m.group(1)), int(m.group(2)), line_number)
+        elif ":" in line:
+            if meeting is None:
+                raise CallRoleError(source_name, line_number, "\"{}\" before any meeting header".format(line.strip()))
+            ti = line.find(":")
+            if line[:ti].strip().lower() == "skip":
+                meeting.skipped_events.add(strip_name(line[ti+1:]).lower())
+            else:
+                meeting.info[line[:ti].strip()] = strip_name(line[ti+1:])
+
+    if meeting is not None:
+        yield meeting
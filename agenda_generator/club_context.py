@@ -0,0 +1,43 @@
+import os
+import threading
+from os import path
+from typing import Dict, Tuple
+from path_util import PathUtil
+from config_registry import ConfigRegistry
+
+
+# club directory -> the context shared by callers that do not pass one
+_default_contexts = {}  # type: Dict[str, ClubContext]
+_default_contexts_lock = threading.Lock()
+
+
+class ClubContext:
+    """
+    Everything that belongs to one club: its directory tree (data/, config/, templates/, log/ and output/ under
+    root), its configs and its compiled templates. Contexts share nothing, so one process can serve several clubs;
+    lock serializes the generations of one club, which share its files.
+    """
+    def __init__(self, root=None, name=None):
+        self.path_util = PathUtil(root)
+        self.name = path.basename(self.path_util.current_dir) if name is None else name
+        self.config = ConfigRegistry(self.path_util)
+        # (template path, language) -> (template modification time, localization config, compiled template)
+        self.compiled_templates = {}  # type: Dict[Tuple[str, str], Tuple[int, object, object]]
+        self.lock = threading.RLock()
+        for directory in [self.path_util.get_log_path(""), self.path_util.get_output_path("")]:
+            os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def default(cls, root=None) -> "ClubContext":
+        """
+        :return: the context of the club at root, the package directory by default, created on first use and shared
+            afterwards so its config and template caches are too
+        """
+        current_dir = PathUtil(root).current_dir
+        with _default_contexts_lock:
+            if current_dir not in _default_contexts:
+                _default_contexts[current_dir] = cls(current_dir)
+            return _default_contexts[current_dir]
+
+    def __repr__(self):
+        return "ClubContext({!r}, {!r})".format(self.path_util.current_dir, self.name)
@@ -0,0 +1,48 @@
+import hashlib
+import json
+import os
+from types import MappingProxyType
+from typing import Dict, Tuple
+from path_util import PathUtil
+
+
+def freeze(value):
+    """
+    Turn parsed JSON into a read-only structure so the shared config objects cannot be modified by one user.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ConfigRegistry:
+    """
+    Loads each file in config/ once and hands out the same read-only object to every caller. A file is read again
+    only when its modification time or size changes, and re-parsed only when its content hash changes too. Each club
+    has its own registry (see ClubContext).
+    """
+    def __init__(self, path_util=None):
+        self._path_util = PathUtil() if path_util is None else path_util
+        # config name -> ((mtime, size), content hash, frozen config)
+        self._entries = {}  # type: Dict[str, Tuple[Tuple[int, int], str, object]]
+
+    def get(self, config_name):
+        config_path = self._path_util.get_config_path(config_name)
+        stat = os.stat(config_path)
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(config_name)
+        if entry is not None and entry[0] == file_key:
+            return entry[2]
+
+        with open(config_path, "rb") as config_file:
+            content = config_file.read()
+            config_file.close()
+        content_hash = hashlib.sha1(content).hexdigest()
+        if entry is not None and entry[1] == content_hash:
+            config = entry[2]
+        else:
+            config = freeze(json.loads(content.decode("utf-8")))
+        self._entries[config_name] = (file_key, content_hash, config)
+        return config
@@ -0,0 +1,175 @@
+import csv
+import os
+import re
+import sys
+from os import path
+from typing import Dict, Iterator, List, Optional, Tuple
+from member import MemberInfoLibrary, role_code
+from call_role import parse_call_role
+from path_util import PathUtil
+
+
+FEEDBACK_LOG_PATTERN = re.compile(r"^([0-9]{8})\.csv$")
+FEEDBACK_COLUMN_PATTERN = re.compile(r"^[0-9]+\.\s*Feedback on (.+)$")
+SPEAKER_PATTERN = re.compile(r"^([0-9]+)(?:st|nd|rd|th) Speaker$")
+# survey subjects held by a function role; "our meeting" is about the whole meeting and has no member
+FEEDBACK_ROLES = {
+    "Toastmaster": "Toastmaster",
+    "Table Topic Master": "TTM",
+    "Evaluation Team": "GE"
+}
+
+
+class FeedbackEntry:
+    __slots__ = ["date_str", "subject", "text", "answer_id", "member_name"]
+
+    def __init__(self, date_str: str, subject: str, text: str, answer_id: str, member_name: Optional[str]):
+        self.date_str = date_str
+        self.subject = subject
+        self.text = text
+        self.answer_id = answer_id
+        self.member_name = member_name
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        return {
+            "Date": self.date_str,
+            "Subject": self.subject,
+            "Feedback": self.text,
+            "Answer": self.answer_id,
+            "English Name": self.member_name
+        }
+
+
+class FeedbackIndex:
+    """
+    Survey feedback of every log/{date}.csv export, indexed by the english name of the member who held the role or
+    gave the speech the feedback is about. Feedback nobody can be matched to, like "Feedback on our meeting", is
+    kept per meeting date.
+    """
+    def __init__(self, member_lib: MemberInfoLibrary, path_util=None):
+        self._member_lib = member_lib
+        self._path_util = PathUtil() if path_util is None else path_util
+        self._by_member = {}  # type: Dict[str, List[FeedbackEntry]]
+        self._unmatched = {}  # type: Dict[str, List[FeedbackEntry]]
+
+    def feedback_logs(self) -> List[Tuple[str, str]]:
+        """
+        :return: (date_str, path) of every survey export in the log folder, in date order
+        """
+        log_dir = self._path_util.get_log_path("")
+        logs = []
+        for file_name in os.listdir(log_dir):
+            m = FEEDBACK_LOG_PATTERN.match(file_name)
+            if m is not None:
+                logs.append((m.group(1), path.join(log_dir, file_name)))
+        return sorted(logs)
+
+    def ingest_all(self) -> int:
+        return sum(self.ingest(csv_path, date_str) for date_str, csv_path in self.feedback_logs())
+
+    def ingest(self, csv_path: str, date_str: str) -> int:
+        """
+        :return: the number of non-empty answers added to the index
+        """
+        count = 0
+        for entry in self.read_entries(csv_path, date_str):
+            if entry.member_name is None:
+                self._unmatched.setdefault(entry.date_str, []).append(entry)
+            else:
+                self._by_member.setdefault(entry.member_name, []).append(entry)
+            count += 1
+        return count
+
+    def read_entries(self, csv_path: str, date_str: str) -> Iterator[FeedbackEntry]:
+        with open(csv_path, "r", encoding="utf-8-sig", newline="") as csv_file:
+            reader = csv.reader(csv_file)
+            header = next(reader, None)
+            if header is None:
+                return
+            columns = []  # type: List[Tuple[int, str, Optional[str]]]
+            for i, column_name in enumerate(header):
+                m = FEEDBACK_COLUMN_PATTERN.match(column_name.strip())
+                if m is not None:
+                    subject = m.group(1).strip()
+                    columns.append((i, subject, self.subject_taker(date_str, subject)))
+            for row in reader:
+                answer_id = row[0] if len(row) > 0 else ""
+                for i, subject, member_name in columns:
+                    text = row[i].strip() if i < len(row) else ""
+                    if len(text) != 0:
+                        yield FeedbackEntry(date_str, subject, text, answer_id, member_name)
+            csv_file.close()
+
+    def subject_taker(self, date_str: str, subject: str) -> Optional[str]:
+        """
+        :return: english name of the member a survey subject refers to on date_str, or None if it is not a member
+            or nobody in the records matches
+        """
+        members = self._member_lib.members_on(date_str)
+        if subject in FEEDBACK_ROLES:
+            code = role_code(FEEDBACK_ROLES[subject])
+            for member in members:
+                role_dates, role_codes = member.role_columns
+                if any(role_dates[i] == int(date_str) and role_codes[i] == code for i in range(len(role_dates))):
+                    return member.english_name
+            return None
+
+        m = SPEAKER_PATTERN.match(subject)
+        if m is None:
+            return None
+        speakers = [member for member in members if int(date_str) in member.speech_columns[0]]
+        speaker_name = self.speaker_name(date_str, int(m.group(1)))
+        if speaker_name is not None:
+            # the member the generator recorded the speech for under that name
+            speaker = self._member_lib.resolve(speaker_name)
+            if speaker in speakers:
+                return speaker.english_name
+        elif len(speakers) == 1 and m.group(1) == "1":
+            return speakers[0].english_name
+        return None
+
+    def speaker_name(self, date_str: str, number: int) -> Optional[str]:
+        """
+        :return: the SP{number} name in the call role log of date_str, None if the log or the speaker is missing
+        """
+        call_role_path = self._path_util.get_log_path("{}.call_role.txt".format(date_str))
+        if not path.exists(call_role_path):
+            return None
+        with open(call_role_path, "r", encoding="utf-8") as call_role_file:
+            for record in parse_call_role(call_role_file, call_role_path):
+                if "{:02d}{:02d}".format(record.month, record.day) == date_str[4:]:
+                    name = record.info.get("SP{}".format(number), "").strip()
+                    return name if len(name) != 0 else None
+            call_role_file.close()
+        return None
+
+    def for_member(self, english_name: str) -> List[FeedbackEntry]:
+        return self._by_member.get(english_name, [])
+
+    def for_meeting(self, date_str: str) -> List[FeedbackEntry]:
+        """
+        :return: the feedback of date_str that is not about a member
+        """
+        return self._unmatched.get(date_str, [])
+
+    @property
+    def member_names(self) -> List[str]:
+        return sorted(self._by_member)
+
+
+def __main__():
+    member_lib = MemberInfoLibrary()
+    feedback_index = FeedbackIndex(member_lib)
+    feedback_index.ingest_all()
+    if len(sys.argv) == 1:
+        for english_name in feedback_index.member_names:
+            print("{}: {}".format(english_name, len(feedback_index.for_member(english_name))))
+        return
+    for name in sys.argv[1:]:
+        english_name = member_lib.find(name).english_name
+        for entry in feedback_index.for_member(english_name):
+            print("{} {} ({}): {}".format(entry.date_str, english_name, entry.subject, entry.text))
+
+
+if __name__ == "__main__":
+    __main__()
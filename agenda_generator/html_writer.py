@@ -0,0 +1,174 @@
+from html import escape
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, TextIO, Tuple
+import re
+
+
+# tags BeautifulSoup's html.parser builder closes immediately and prints as <tag/>
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem", "meta", "param",
+    "source", "track", "wbr", "basefont", "bgsound", "command", "frame", "image", "isindex", "nextid", "spacer"
+}
+# tags whose text is written verbatim, without entity substitution
+CDATA_TAGS = {"script", "style"}
+PLACEHOLDER_PATTERN = re.compile(r"{{(.*?)}}")
+
+
+def escape_text(text: str) -> str:
+    return escape(text, quote=False)
+
+
+def format_attribute(name: str, value: str) -> str:
+    value = escape(value, quote=False)
+    if "\"" not in value:
+        return " {}=\"{}\"".format(name, value)
+    if "'" not in value:
+        return " {}='{}'".format(name, value)
+    return " {}=\"{}\"".format(name, value.replace("\"", "&quot;"))
+
+
+def fill_placeholders(text: str, values: Dict[str, str]) -> str:
+    return PLACEHOLDER_PATTERN.sub(lambda m: values[m.group(1)] if m.group(1) in values else m.group(0), text)
+
+
+def write_row(stream: TextIO, columns: List[Tuple[str, str]], depth: int):
+    """
+    Write an agenda row exactly as BeautifulSoup.prettify() prints the one built by Session.create_row.
+    """
+    indent = " " * depth
+    stream.write(indent + "<div class=\"row\">\n")
+    for i, column in enumerate(columns):
+        _class, value = column
+        _class = "column {}".format(_class)
+        if i == len(columns) - 1:
+            _class = _class + " last-column"
+        stream.write(indent + " <div" + format_attribute("class", _class) + ">\n")
+        text = escape_text((value or "").strip())
+        if len(text) != 0:
+            stream.write(indent + "  " + text + "\n")
+        stream.write(indent + " </div>\n")
+    stream.write(indent + "</div>\n")
+
+
+def write_empty_element(stream: TextIO, name: str, attributes: List[Tuple[str, str]], depth: int):
+    indent = " " * depth
+    stream.write(indent + "<" + name + "".join(format_attribute(*attribute) for attribute in attributes) + ">\n")
+    stream.write(indent + "</" + name + ">\n")
+
+
+class _Element:
+    def __init__(self, name: str, attributes: List[Tuple[str, str]], parent: Optional["_Element"]):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.children = []  # type: List[object]
+
+
+class _TreeBuilder(HTMLParser):
+    """
+    Builds the same tree as BeautifulSoup's html.parser builder: no implied end tags, void tags closed at once and
+    unmatched end tags ignored.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _Element("[document]", [], None)
+        self._current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        element = _Element(tag, [(name, value if value is not None else "") for name, value in attrs], self._current)
+        self._current.children.append(element)
+        if tag not in VOID_TAGS:
+            self._current = element
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        element = self._current
+        while element is not self.root and element.name != tag:
+            element = element.parent
+        if element is not self.root:
+            self._current = element.parent
+
+    def handle_data(self, data):
+        if self._current.name in CDATA_TAGS:
+            self._current.children.append(("cdata", data))
+        else:
+            self._current.children.append(("text", data))
+
+    def handle_comment(self, data):
+        self._current.children.append(("literal", "<!--" + data + "-->"))
+
+    def handle_decl(self, decl):
+        self._current.children.append(("literal", "<!" + decl + ">"))
+
+
+class PrettyTemplate:
+    """
+    A localized agenda template laid out the way BeautifulSoup.prettify() prints it, kept as literal segments plus
+    the text nodes and attributes that still hold per-meeting placeholders, and the position of <div id="body">.
+    """
+    def __init__(self, html_template: str):
+        builder = _TreeBuilder()
+        builder.feed(html_template)
+        builder.close()
+        # str segments are literal; tuples are ("text", depth, raw), ("attribute", name, raw) or ("body", depth)
+        self._segments = []  # type: List[object]
+        self._body_found = False
+        for child in builder.root.children:
+            self._layout(child, 0)
+        if not self._body_found:
+            raise ValueError("agenda template has no <div id=\"body\">")
+
+    def _literal(self, text: str):
+        if len(self._segments) > 0 and isinstance(self._segments[-1], str):
+            self._segments[-1] += text
+        else:
+            self._segments.append(text)
+
+    def _layout(self, node, depth: int):
+        indent = " " * depth
+        if isinstance(node, tuple):
+            kind, text = node
+            if PLACEHOLDER_PATTERN.search(text) is not None and kind == "text":
+                self._segments.append(("text", depth, text))
+                return
+            text = text.strip() if kind != "text" else escape_text(text.strip())
+            if len(text) != 0:
+                self._literal(indent + text + "\n")
+            return
+
+        self._literal(indent + "<" + node.name)
+        for name, value in node.attributes:
+            if PLACEHOLDER_PATTERN.search(value) is not None:
+                self._segments.append(("attribute", name, value))
+            else:
+                self._literal(format_attribute(name, value))
+        if node.name in VOID_TAGS:
+            self._literal("/>\n")
+            return
+        self._literal(">\n")
+        for child in node.children:
+            self._layout(child, depth + 1)
+        if not self._body_found and ("id", "body") in node.attributes and node.name == "div":
+            self._body_found = True
+            self._segments.append(("body", depth + 1))
+        self._literal(indent + "</" + node.name + ">\n")
+
+    def write(self, stream: TextIO, values: Dict[str, str], write_body):
+        """
+        :param write_body: called with the stream and the indentation depth of the body's children
+        """
+        for segment in self._segments:
+            if isinstance(segment, str):
+                stream.write(segment)
+            elif segment[0] == "text":
+                text = escape_text(fill_placeholders(segment[2], values).strip())
+                if len(text) != 0:
+                    stream.write(" " * segment[1] + text + "\n")
+            elif segment[0] == "attribute":
+                stream.write(format_attribute(segment[1], fill_placeholders(segment[2], values)))
+            else:
+                write_body(stream, segment[1])
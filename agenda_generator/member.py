@@ -1,7 +1,20 @@
 import json
-from path_util import PathUtil
+import bisect
+import filecmp
+import hashlib
+import marshal
+import mmap
+import os
+import re
+import sys
+import tempfile
+import threading
+from array import array
+from name_index import NamePrefixIndex, NameFuzzyIndex
+from club_context import ClubContext
+import profiler
 from os import path
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 
 def min_distance(word1, word2):
@@ -10,7 +23,7 @@ def min_distance(word1, word2):
     :type word2: str
     :rtype: int
     """
-    dp_matrix = list(range(0, len(word2) + 1))
+    dp_matrix = [list(range(0, len(word2) + 1))]
     for end_index1 in range(1, len(word1) + 1):
         dp_row = [end_index1]
         dp_matrix.append(dp_row)
@@ -28,39 +41,300 @@ def min_distance(word1, word2):
     return dp_matrix[len(word1)][len(word2)]
 
 
+class _CodeTable:
+    """
+    Interns the few distinct role, level and speech type names as small integer codes shared by all records.
+    """
+    def __init__(self):
+        self._codes = {}  # type: Dict[str, int]
+        self._values = []  # type: List[str]
+        # libraries of several clubs may load on threads at once, and a name must never get two codes
+        self._lock = threading.Lock()
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    code = len(self._values)
+                    self._values.append(value)
+                    self._codes[value] = code
+        return code
+
+    def value(self, code: int) -> str:
+        return self._values[code]
+
+
+# bumped whenever the layout of MemberInfo.to_snapshot changes
+BINARY_SNAPSHOT_VERSION = 2
+
+_roles = _CodeTable()
+_levels = _CodeTable()
+_speech_types = _CodeTable()
+
+
+def role_name(role_code: int) -> str:
+    return _roles.value(role_code)
+
+
+def role_code(role: str) -> int:
+    return _roles.code(role)
+
+
+def level_name(level_code: int) -> str:
+    return _levels.value(level_code)
+
+
+def snapshot_code_tables() -> Tuple[List[str], List[str], List[str]]:
+    """
+    :return: the role, level and speech type names by code, which give meaning to the codes in MemberInfo.to_snapshot
+    """
+    return list(_roles._values), list(_levels._values), list(_speech_types._values)
+
+
+def snapshot_code_maps(code_tables) -> Tuple[Optional[List[int]], ...]:
+    """
+    :param code_tables: snapshot_code_tables() of the process that wrote a snapshot
+    :return: for each table, the code in this process of every code in that one, or None where they are the same
+    """
+    code_maps = []
+    for values, table in zip(code_tables, [_roles, _levels, _speech_types]):
+        code_map = [table.code(value) for value in values]
+        code_maps.append(None if code_map == list(range(len(code_map))) else code_map)
+    return tuple(code_maps)
+
+
+def _code_array(data: bytes, code_map: Optional[List[int]]) -> array:
+    codes = array("H")
+    codes.frombytes(data)
+    if code_map is not None:
+        codes = array("H", [code_map[code] for code in codes])
+    return codes
+
+
+def scan_member_list(data: bytes, file_name="member info") -> List[Tuple[int, int, Dict[str, object]]]:
+    """
+    Parse a member list once, member by member.
+    :return: the byte range and json of every member
+    """
+    text = data[:].decode("utf-8")
+    ascii_only = len(text) == len(data)
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r"[ \t\r\n]*")
+    members = []
+    index = whitespace.match(text, 0).end()
+    if text[index:index + 1] != "[":
+        raise ValueError("{} does not hold a member list".format(file_name))
+    index = whitespace.match(text, index + 1).end()
+    byte_index, char_index = 0, 0
+    while text[index:index + 1] not in ["]", ""]:
+        member_info_json, end = decoder.raw_decode(text, index)
+        if ascii_only:
+            start_byte, end_byte = index, end
+        else:
+            start_byte = byte_index + len(text[char_index:index].encode("utf-8"))
+            end_byte = start_byte + len(text[index:end].encode("utf-8"))
+            byte_index, char_index = end_byte, end
+        members.append((start_byte, end_byte, member_info_json))
+        index = whitespace.match(text, end).end()
+        if text[index:index + 1] == ",":
+            index = whitespace.match(text, index + 1).end()
+    return members
+
+
+def fsync_directory(directory: str):
+    """
+    Make a rename inside directory durable; windows cannot open directories and needs no such step.
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    directory_fd = os.open(directory or ".", os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(directory_fd)
+    finally:
+        os.close(directory_fd)
+
+
+def write_sidecar(file_path: str, write) -> bool:
+    """
+    Replace a cache file kept next to the member info file through a temporary file of its own, so concurrent
+    writers never share one. Caches are optional: where they cannot be written, e.g. in a read-only checkout, they
+    are left alone.
+    :param write: called with the temporary file, opened for binary writing
+    :return: whether file_path was written
+    """
+    try:
+        temp_fd, temp_path = tempfile.mkstemp(
+            prefix=path.basename(file_path) + ".", suffix=".tmp", dir=path.dirname(file_path) or "."
+        )
+    except OSError:
+        return False
+    try:
+        with os.fdopen(temp_fd, "wb") as temp_file:
+            write(temp_file)
+            temp_file.close()
+        os.replace(temp_path, file_path)
+        return True
+    except OSError:
+        if path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+
+class UnknownMemberError(ValueError):
+    """
+    A name that matches no member but comes close to some, none of which it can be resolved to confidently.
+    """
+    def __init__(self, role_taker_name: str, suggestions: List[str]):
+        super().__init__("unknown member \"{}\", did you mean {}?".format(
+            role_taker_name, " or ".join("\"{}\"".format(suggestion) for suggestion in suggestions)))
+        self.role_taker_name = role_taker_name
+        self.suggestions = suggestions
+
+
+def _is_sorted(dates) -> bool:
+    return all(dates[i] <= dates[i + 1] for i in range(len(dates) - 1))
+
+
 class MemberInfo:
-    def __init__(self, member_info):
+    # records are stored column-wise, with yyyymmdd dates as integers, and only turned back into dicts by to_dict
+    __slots__ = [
+        "_english_name", "_chinese_name", "nick_names", "_mentor", "_current_level",
+        "_role_dates", "_role_codes", "_role_topics", "_role_has_topic",
+        "_speech_dates", "_speech_levels", "_speech_topics", "_speech_types",
+        "_role_counts", "_role_last_dates", "_level_counts", "_revision"
+    ]
+
+    def __init__(self, member_info, counters=None):
+        """
+        :param counters: counters saved with the snapshot member_info comes from, recounted from the records if None
+        """
+        self._revision = 0
         self._english_name = member_info["English Name"]
         self._chinese_name = member_info["Chinese Name"]
-        self._role_records = sorted(member_info["Role Records"], key=lambda x: x["Date"])
-        self._speech_records = sorted(member_info["Speech Records"], key=lambda x: x["Date"])
         self.nick_names = [] if "Nick Names" not in member_info else member_info["Nick Names"]
         self._mentor = None
 
+        role_records = member_info["Role Records"]
+        if not _is_sorted([record["Date"] for record in role_records]):
+            role_records = sorted(role_records, key=lambda x: x["Date"])
+        self._role_dates = array("i", [int(record["Date"]) for record in role_records])
+        self._role_codes = array("H", [_roles.code(record["Role"]) for record in role_records])
+        self._role_topics = [record.get("Topic") for record in role_records]
+        self._role_has_topic = bytearray("Topic" in record for record in role_records)
+
+        speech_records = member_info["Speech Records"]
+        if not _is_sorted([record["Date"] for record in speech_records]):
+            speech_records = sorted(speech_records, key=lambda x: x["Date"])
+        self._speech_dates = array("i", [int(record["Date"]) for record in speech_records])
+        self._speech_levels = array("H", [_levels.code(record["Level"]) for record in speech_records])
+        self._speech_topics = [record["Topic"] for record in speech_records]
+        self._speech_types = array("H", [
+            _speech_types.code("pathway" if record["Level"].startswith("Level") else "CC")
+            for record in speech_records
+        ])
+
         if "Current Level" in member_info:
             self._current_level = member_info["Current Level"]
         else:
             self.reset_level()
 
-        for speech in self._speech_records:
-            if speech["Level"].startswith("Level"):
-                speech["Type"] = "pathway"
-            else:
-                speech["Type"] = "CC"
+        # role code -> count and last yyyymmdd, level code -> speech count; kept in step with the record columns
+        self._role_counts = {}  # type: Dict[int, int]
+        self._role_last_dates = {}  # type: Dict[int, int]
+        self._level_counts = {}  # type: Dict[int, int]
+        self._load_counters(self.counters_from_records() if counters is None else counters)
+
+    def to_snapshot(self) -> tuple:
+        """
+        :return: the member as a tuple of plain values for marshal; codes are only meaningful with the
+            snapshot_code_tables of this process
+        """
+        return (
+            self._english_name, self._chinese_name, self.nick_names,
+            self._mentor.english_name if self._mentor is not None else None, self._current_level,
+            self._role_dates.tobytes(), self._role_codes.tobytes(), self._role_topics, bytes(self._role_has_topic),
+            self._speech_dates.tobytes(), self._speech_levels.tobytes(), self._speech_topics,
+            self._speech_types.tobytes(),
+            self._role_counts, self._role_last_dates, self._level_counts
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot: tuple, code_maps) -> "MemberInfo":
+        """
+        :param code_maps: snapshot_code_maps of the tables the snapshot was written with
+        :return: the member without its mentor, which the library sets once every member is loaded
+        """
+        role_map, level_map, type_map = code_maps
+        member_info = cls.__new__(cls)
+        (member_info._english_name, member_info._chinese_name, member_info.nick_names, _,
+         member_info._current_level, role_dates, role_codes, member_info._role_topics, role_has_topic, speech_dates,
+         speech_levels, member_info._speech_topics, speech_types, role_counts, role_last_dates, level_counts) = snapshot
+        member_info._mentor = None
+        member_info._revision = 0
+        member_info._role_dates = array("i")
+        member_info._role_dates.frombytes(role_dates)
+        member_info._role_codes = _code_array(role_codes, role_map)
+        member_info._role_has_topic = bytearray(role_has_topic)
+        member_info._speech_dates = array("i")
+        member_info._speech_dates.frombytes(speech_dates)
+        member_info._speech_levels = _code_array(speech_levels, level_map)
+        member_info._speech_types = _code_array(speech_types, type_map)
+        if role_map is not None:
+            role_counts = {role_map[code]: count for code, count in role_counts.items()}
+            role_last_dates = {role_map[code]: date for code, date in role_last_dates.items()}
+        if level_map is not None:
+            level_counts = {level_map[code]: count for code, count in level_counts.items()}
+        member_info._role_counts = role_counts
+        member_info._role_last_dates = role_last_dates
+        member_info._level_counts = level_counts
+        return member_info
 
     def set_mentor(self, mentor_name, member_library):
         self._mentor = member_library.find(mentor_name)
+        self._revision += 1
 
     @property
     def mentor(self):
         return self._mentor
 
+    @property
+    def revision(self) -> int:
+        """
+        :return: a number bumped by every change to the records, level or mentor, not to the names
+        """
+        return self._revision
+
     def reset_level(self):
-        if len(self._speech_records) > 0:
-            self._current_level = self._speech_records[-1]["Level"]
+        self._revision += 1
+        if len(self._speech_levels) > 0:
+            self._current_level = _levels.value(self._speech_levels[-1])
         else:
             self._current_level = "NotStarted"
 
+    @property
+    def role_records(self) -> List[Dict[str, str]]:
+        role_records = []
+        for i in range(len(self._role_dates)):
+            record = {
+                "Role": _roles.value(self._role_codes[i]),
+                "Date": str(self._role_dates[i])
+            }
+            if self._role_has_topic[i]:
+                record["Topic"] = self._role_topics[i]
+            role_records.append(record)
+        return role_records
+
+    @property
+    def speech_records(self) -> List[Dict[str, str]]:
+        return [{
+            "Level": _levels.value(self._speech_levels[i]),
+            "Date": str(self._speech_dates[i]),
+            "Topic": self._speech_topics[i],
+            "Type": _speech_types.value(self._speech_types[i])
+        } for i in range(len(self._speech_dates))]
+
     def to_dict(self):
         return {
             "English Name": self._english_name,
@@ -68,19 +342,33 @@ class MemberInfo:
             "Nick Names": self.nick_names,
             "Mentor Name": self.mentor.english_name if self.mentor is not None else None,
             "Current Level": self.current_level,
-            "Role Records": self._role_records,
-            "Speech Records": self._speech_records
+            "Role Records": self.role_records,
+            "Speech Records": self.speech_records
         }
 
-    def to_statistics_row(self):
+    @property
+    def role_columns(self) -> Tuple[array, array]:
+        """
+        :return: dates and role codes (see role_name) of the role records, to be read only
+        """
+        return self._role_dates, self._role_codes
+
+    @property
+    def speech_columns(self) -> Tuple[array, array]:
+        """
+        :return: dates and level codes (see level_name) of the speech records, to be read only
+        """
+        return self._speech_dates, self._speech_levels
+
+    def to_statistics_row(self, speech_since="20200901"):
         row_dict = {
             "Mentor Name": None if self.mentor is None else self.mentor.english_name,
             "Name": self.english_name,
             "Current Level": self.current_level,
-            "Speech": len(list(filter(lambda x: x["Date"] > "20200901", self._speech_records)))
+            "Speech": len(self._speech_dates) - bisect.bisect_right(self._speech_dates, int(speech_since))
         }
         for role in ["Toastmaster", "GE", "TTM", "TTE", "Word Smith", "Ah counter", "Timer", "IE"]:
-            row_dict[role] = len(list(filter(lambda x: x["Role"] == role, self._role_records)))
+            row_dict[role] = self.role_count(role)
         return row_dict
 
     @property
@@ -97,93 +385,570 @@ class MemberInfo:
 
     @property
     def level(self):
-        return self._speech_records[-1]["Level"] if len(self._speech_records) > 0 else "NotStarted"
+        return _levels.value(self._speech_levels[-1]) if len(self._speech_levels) > 0 else "NotStarted"
+
+    @property
+    def record_dates(self) -> Set[str]:
+        return set(map(str, self._role_dates + self._speech_dates))
 
     def clear_records(self, date_str):
-        if len(self._speech_records) > 0 and self._speech_records[-1]["Date"] >= date_str:
-            self._speech_records = list(filter(
-                lambda x: x["Date"] < date_str,
-                self._speech_records
-            ))
-
-        if len(self._role_records) > 0 and self._role_records[-1]["Date"] >= date_str:
-            self._role_records = list(filter(
-                lambda x: x["Date"] < date_str,
-                self._role_records
-            ))
+        index = bisect.bisect_left(self._speech_dates, int(date_str))
+        for level_code in self._speech_levels[index:]:
+            self._level_counts[level_code] -= 1
+            if self._level_counts[level_code] == 0:
+                del self._level_counts[level_code]
+        del self._speech_dates[index:]
+        del self._speech_levels[index:]
+        del self._speech_topics[index:]
+        del self._speech_types[index:]
+
+        index = bisect.bisect_left(self._role_dates, int(date_str))
+        cleared_codes = set(self._role_codes[index:])
+        for role_code in self._role_codes[index:]:
+            self._role_counts[role_code] -= 1
+        del self._role_dates[index:]
+        del self._role_codes[index:]
+        del self._role_topics[index:]
+        del self._role_has_topic[index:]
+        for role_code in cleared_codes:
+            if self._role_counts[role_code] == 0:
+                del self._role_counts[role_code]
+                del self._role_last_dates[role_code]
+            else:
+                self._role_last_dates[role_code] = self._role_dates[self._last_role_index(role_code)]
 
         self.reset_level()
 
     def append_speech(self, new_level, date_str, topic, speech_type):
+        self._revision += 1
         self._current_level = new_level
-        self._speech_records.append({
-            "Level": new_level,
-            "Date": date_str,
-            "Topic": topic,
-            "Type": speech_type
-        })
+        index = bisect.bisect_right(self._speech_dates, int(date_str))
+        self._speech_dates.insert(index, int(date_str))
+        self._speech_levels.insert(index, _levels.code(new_level))
+        self._speech_topics.insert(index, topic)
+        self._speech_types.insert(index, _speech_types.code(speech_type))
+        level_code = self._speech_levels[index]
+        self._level_counts[level_code] = self._level_counts.get(level_code, 0) + 1
 
     def take_function_role(self, role_name, date_str, topic):
-        if role_name in ["TTM", "Toastmaster"]:
-            self._role_records.append({
-                "Role": role_name,
-                "Date": date_str,
-                "Topic": topic
-            })
-        elif role_name not in ["SAA", "President", "VPM"]:
-            self._role_records.append({
-                "Role": role_name,
-                "Date": date_str
-            })
+        if role_name in ["SAA", "President", "VPM"]:
+            return False
+        self._revision += 1
+        has_topic = role_name in ["TTM", "Toastmaster"]
+        index = bisect.bisect_right(self._role_dates, int(date_str))
+        self._role_dates.insert(index, int(date_str))
+        self._role_codes.insert(index, _roles.code(role_name))
+        self._role_topics.insert(index, topic if has_topic else None)
+        self._role_has_topic.insert(index, has_topic)
+        role_code = self._role_codes[index]
+        self._role_counts[role_code] = self._role_counts.get(role_code, 0) + 1
+        self._role_last_dates[role_code] = max(self._role_last_dates.get(role_code, 0), int(date_str))
+        return True
+
+    def _last_role_index(self, role_code) -> int:
+        for i in range(len(self._role_codes) - 1, -1, -1):
+            if self._role_codes[i] == role_code:
+                return i
+        return -1
+
+    def role_count(self, role_name) -> int:
+        return self._role_counts.get(_roles.code(role_name), 0)
+
+    def last_role_date(self, role_name) -> Optional[str]:
+        last_date = self._role_last_dates.get(_roles.code(role_name))
+        return None if last_date is None else str(last_date)
+
+    def speech_count(self, level=None) -> int:
+        if level is None:
+            return len(self._speech_dates)
+        return self._level_counts.get(_levels.code(level), 0)
+
+    @property
+    def counters(self) -> Dict[str, Dict[str, object]]:
+        """
+        :return: {"Roles": {role: [count, last date]}, "Levels": {level: speech count}}, keyed by name so it can be
+            saved across processes
+        """
+        return {
+            "Roles": {
+                _roles.value(role_code): [count, str(self._role_last_dates[role_code])]
+                for role_code, count in sorted(self._role_counts.items())
+            },
+            "Levels": {
+                _levels.value(level_code): count for level_code, count in sorted(self._level_counts.items())
+            }
+        }
+
+    def counters_from_records(self) -> Dict[str, Dict[str, object]]:
+        """
+        :return: the counters recounted from the record columns, in the form of counters
+        """
+        roles = {}  # type: Dict[str, List[object]]
+        for i in range(len(self._role_codes)):
+            role_name = _roles.value(self._role_codes[i])
+            if role_name in roles:
+                roles[role_name][0] += 1
+                roles[role_name][1] = max(roles[role_name][1], str(self._role_dates[i]))
+            else:
+                roles[role_name] = [1, str(self._role_dates[i])]
+        levels = {}  # type: Dict[str, int]
+        for level_code in self._speech_levels:
+            level_name = _levels.value(level_code)
+            levels[level_name] = levels.get(level_name, 0) + 1
+        return {"Roles": roles, "Levels": levels}
+
+    def _load_counters(self, counters):
+        self._role_counts.clear()
+        self._role_last_dates.clear()
+        self._level_counts.clear()
+        for role_name, (count, last_date) in counters["Roles"].items():
+            self._role_counts[_roles.code(role_name)] = count
+            self._role_last_dates[_roles.code(role_name)] = int(last_date)
+        for level_name, count in counters["Levels"].items():
+            self._level_counts[_levels.code(level_name)] = count
+
+    def counter_drift(self) -> List[str]:
+        """
+        :return: one line per counter that disagrees with the records, empty if the counters are consistent
+        """
+        drift = []
+        kept, expected = self.counters, self.counters_from_records()
+        for role_name in sorted(set(kept["Roles"]) | set(expected["Roles"])):
+            kept_count, kept_last = kept["Roles"].get(role_name, [0, None])
+            count, last_date = expected["Roles"].get(role_name, [0, None])
+            if kept_count != count:
+                drift.append("{} count is {}, records have {}".format(role_name, kept_count, count))
+            if kept_last != last_date:
+                drift.append("{} last date is {}, records have {}".format(role_name, kept_last, last_date))
+        for level_name in sorted(set(kept["Levels"]) | set(expected["Levels"])):
+            kept_count, count = kept["Levels"].get(level_name, 0), expected["Levels"].get(level_name, 0)
+            if kept_count != count:
+                drift.append("{} speech count is {}, records have {}".format(level_name, kept_count, count))
+        return drift
 
     @property
     def last_speech_topic(self) -> str:
-        return self._speech_records[-1]["Topic"]
+        return self._speech_topics[-1]
 
 
 class MemberInfoLibrary:
-    def __init__(self, member_info_path=None):
-        self._path_util = PathUtil()
+    def __init__(self, member_info_path=None, auto_resolve_confidence=None, journal=False, club=None):
+        """
+        :param auto_resolve_confidence: unknown names whose closest member reaches this confidence (1 minus edit
+            distance over name length) resolve to that member; below it, or with None, find raises UnknownMemberError
+            with the closest members as suggestions
+        :param journal: dump() appends the changes made since loading to the journal next to the member info file
+            instead of rewriting it; the journal is always applied on load and folded back in by compact()
+        :param club: the club whose data/member_info.json and learning path are used, the package directory by default
+        """
+        with profiler.span("MemberInfoLibrary.__init__"):
+            self._club = ClubContext.default() if club is None else club
+            self._path_util = self._club.path_util
+            self._auto_resolve_confidence = auto_resolve_confidence
+            self._journal_enabled = journal
+            self._pending_events = []  # type: List[Dict[str, str]]
+
+            self._member_info_path = self._path_util.default_member_info_path \
+                if member_info_path is None else member_info_path
+            self._journal_path = path.splitext(self._member_info_path)[0] + ".journal"
+            self._counters_path = path.splitext(self._member_info_path)[0] + ".counters.json"
+            self._binary_snapshot_path = path.splitext(self._member_info_path)[0] + ".snapshot"
+
+            self._member_info_list = []  # type: List[Optional[MemberInfo]]
+            self._member_positions = {}  # type: Dict[MemberInfo, int]
+            self._english_names = {}  # type: Dict[str, int]
+            self._names = []  # type: List[List[str]]
+            # date -> positions of members holding a record on that date, with the dates kept sorted
+            self._members_by_date = {}  # type: Dict[str, Set[int]]
+            self._record_dates = []  # type: List[str]
+            self._name_index = NamePrefixIndex()
+            self._fuzzy_index = None  # type: Optional[NameFuzzyIndex]
+            # the member info file as loaded or last written: mapped when first needed, with the byte range of
+            # every member once known, and the revision each member had when the file last matched it
+            self._snapshot = None  # type: Optional[mmap.mmap]
+            self._member_ranges = None  # type: Optional[List[Tuple[int, int]]]
+            self._clean_revisions = []  # type: List[int]
+            self._snapshot_state = None  # type: Optional[Tuple[int, int]]
+            self._load()
+            self._mark_clean()
 
-        self._member_info_path = path.join(self._path_util.current_dir, "data", "member_info.json") \
-            if member_info_path is None else member_info_path
+            learning_path = self._club.config.get("learning_path")
+            self._pathway_path = learning_path["pathway"]  # type: List[str]
+            self._cc_path = learning_path["CC"]
 
-        with open(self._member_info_path, "r", encoding="utf-8") as member_info_file:
-            member_info_list = json.load(member_info_file)
-            self._member_info_list = []
+            if path.exists(self._journal_path):
+                with profiler.span("apply journal"):
+                    self._apply_journal()
+
+    def _load(self):
+        if self._load_binary_snapshot():
+            return
+        with profiler.span("load json"):
+            # hashed as bytes, as the binary snapshot and dumps hash the file, whatever its line endings
+            with open(self._member_info_path, "rb") as member_info_file:
+                snapshot = member_info_file.read()
+                member_info_file.close()
+            member_info_list = json.loads(snapshot.decode("utf-8"))
+            snapshot_hash = hashlib.sha1(snapshot).hexdigest()
+            saved_counters = self._read_counters(snapshot_hash)
             for member_info_json in member_info_list:
-                self._member_info_list.append(MemberInfo(member_info_json))
-            member_info_file.close()
+                counters = saved_counters.get(member_info_json["English Name"])
+                self._add_member(MemberInfo(member_info_json, counters))
 
             for i, member_info_json in enumerate(member_info_list):
                 if "Mentor Name" in member_info_json and member_info_json["Mentor Name"] is not None:
-                    self._member_info_list[i].set_mentor(member_info_json["Mentor Name"], self)
+                    self._member(i).set_mentor(member_info_json["Mentor Name"], self)
+        # a mentor missing from the file is added as a new member, which the file does not hold
+        if len(self._member_info_list) == len(member_info_list):
+            self._write_binary_snapshot(snapshot_hash)
+
+    def _binary_snapshot_format(self) -> tuple:
+        # marshal data and array bytes are only readable by the same python version on the same byte order
+        return BINARY_SNAPSHOT_VERSION, tuple(sys.version_info[:2]), sys.byteorder
+
+    def _load_binary_snapshot(self) -> bool:
+        """
+        Load the library from the binary snapshot next to the member info file, if that still matches the file by
+        size and modification time, or failing the time, by hash.
+        :return: whether the library was loaded
+        """
+        if not path.exists(self._binary_snapshot_path):
+            return False
+        with profiler.span("load binary snapshot"):
+            try:
+                with open(self._binary_snapshot_path, "rb") as snapshot_file:
+                    # loads of the whole file is several times faster than load reading it piece by piece
+                    binary_snapshot = marshal.loads(snapshot_file.read())
+                    snapshot_file.close()
+            except (EOFError, ValueError, TypeError):
+                return False
+            stat = os.stat(self._member_info_path)
+            if not isinstance(binary_snapshot, dict) \
+                    or binary_snapshot.get("Format") != self._binary_snapshot_format() \
+                    or binary_snapshot["Size"] != stat.st_size:
+                return False
+            if binary_snapshot["Modified"] != stat.st_mtime_ns:
+                with open(self._member_info_path, "rb") as member_info_file:
+                    snapshot_hash = hashlib.sha1(member_info_file.read()).hexdigest()
+                    member_info_file.close()
+                if binary_snapshot["Hash"] != snapshot_hash:
+                    return False
+
+            code_maps = snapshot_code_maps(binary_snapshot["Code Tables"])
+            members = binary_snapshot["Members"]
+            for position, member_snapshot in enumerate(members):
+                member_info = MemberInfo.from_snapshot(member_snapshot, code_maps)
+                self._member_info_list.append(member_info)
+                self._member_positions[member_info] = position
+                # the record dates are indexed below, straight from the snapshot
+                names = [member_info.english_name, member_info.chinese_name, *member_info.nick_names]
+                self._register(position, names, [])
+            self._member_ranges = binary_snapshot["Member Ranges"]
+            self._record_dates = binary_snapshot["Record Dates"]
+            self._members_by_date = {
+                date_str: set(positions) for date_str, positions in binary_snapshot["Members By Date"].items()
+            }
+            for i, member_snapshot in enumerate(members):
+                if member_snapshot[3] is not None:
+                    self._member(i).set_mentor(member_snapshot[3], self)
+        return True
+
+    def _write_binary_snapshot(self, snapshot_hash):
+        """
+        Save the library, which must hold exactly what the member info file does, as the binary snapshot of it.
+        """
+        stat = os.stat(self._member_info_path)
+        binary_snapshot = {
+            "Format": self._binary_snapshot_format(),
+            "Size": stat.st_size,
+            "Modified": stat.st_mtime_ns,
+            "Hash": snapshot_hash,
+            "Code Tables": snapshot_code_tables(),
+            "Members": [member_info.to_snapshot() for member_info in self.members],
+            "Member Ranges": self._member_ranges,
+            "Record Dates": self._record_dates,
+            "Members By Date": {
+                date_str: sorted(positions) for date_str, positions in self._members_by_date.items()
+            }
+        }
+        write_sidecar(self._binary_snapshot_path, lambda snapshot_file: marshal.dump(binary_snapshot, snapshot_file))
+
+    def _member(self, position: int) -> MemberInfo:
+        return self._member_info_list[position]
+
+    def dump(self, member_info_path=None, changed_only=False) -> bool:
+        """
+        :param changed_only: only serialize the members changed since the member info file was loaded or last
+            written, and copy the others from it byte for byte
+        :return: whether any file changed
+        """
+        with profiler.span("MemberInfoLibrary.dump"):
+            if member_info_path is None and self._journal_enabled:
+                return self._append_journal()
+            elif member_info_path is None:
+                return self.compact(changed_only)
+            else:
+                return self._dump_snapshot(member_info_path, changed_only)
+
+    def compact(self, changed_only=False) -> bool:
+        """
+        Write the full library to the member info file and drop the journal it now contains.
+        """
+        changed = self._dump_snapshot(self._member_info_path, changed_only)
+        if path.exists(self._journal_path):
+            os.remove(self._journal_path)
+            changed = True
+        self._pending_events.clear()
+        return changed
 
-        with open(self._path_util.get_config_path("learning_path"), "r", encoding="utf-8") as in_file:
-            learning_path = json.load(in_file)
-            in_file.close()
+    def _member_json(self, position: int, changed_only=False) -> bytes:
+        """
+        :param changed_only: copy the member from the member info file if it has not changed since
+        :return: the member at position as json.dump(..., indent=2) prints it inside the member list, utf-8 encoded
+        """
+        if changed_only and position < len(self._clean_revisions) \
+                and self._clean_revisions[position] == self._member(position).revision:
+            start, end = self._member_ranges[position]
+            return self._snapshot[start:end]
+        return json.dumps(self._member(position).to_dict(), indent=2).replace("\n", "\n  ").encode("utf-8")
+
+    def _mark_clean(self):
+        """
+        Remember every member loaded so far as matching the member info file.
+        """
+        stat = os.stat(self._member_info_path)
+        self._snapshot_state = (stat.st_size, stat.st_mtime_ns)
+        self._clean_revisions = [
+            member_info.revision if member_info is not None else -1 for member_info in self._member_info_list
+        ]
+
+    def _map_snapshot(self) -> bool:
+        """
+        Map the member info file and find the byte range of every member, for members to be copied from it.
+        :return: False if the file has changed since it was loaded or last written, so nothing can be copied
+        """
+        stat = os.stat(self._member_info_path)
+        if (stat.st_size, stat.st_mtime_ns) != self._snapshot_state:
+            return False
+        if self._snapshot is None:
+            with open(self._member_info_path, "rb") as member_info_file:
+                self._snapshot = mmap.mmap(member_info_file.fileno(), 0, access=mmap.ACCESS_READ)
+                member_info_file.close()
+        if self._member_ranges is None:
+            with profiler.span("scan member ranges"):
+                self._member_ranges = [
+                    (start, end) for start, end, _ in scan_member_list(self._snapshot, self._member_info_path)
+                ]
+        return len(self._member_ranges) >= len(self._clean_revisions)
+
+    def _dump_snapshot(self, member_info_path, changed_only=False) -> bool:
+        """
+        Write the member list one member at a time, in the same layout as json.dump(members, indent=2), to a
+        temporary file in the same directory, which is flushed to disk and then atomically replaces
+        member_info_path, unless it holds the same bytes.
+        :param changed_only: copy the members unchanged since the member info file was loaded or last written from it
+        :return: whether member_info_path changed
+        """
+        changed_only = changed_only and self._map_snapshot()
+        digest = hashlib.sha1()
+        member_ranges = []  # type: List[Tuple[int, int]]
+        offset = 0
+        temp_path = member_info_path + ".tmp"
+        with open(temp_path, "wb") as member_info_file:
+            for position in range(len(self._member_info_list)):
+                separator = b"[\n  " if position == 0 else b",\n  "
+                member_json = self._member_json(position, changed_only)
+                for chunk in [separator, member_json]:
+                    member_info_file.write(chunk)
+                    digest.update(chunk)
+                member_ranges.append((offset + len(separator), offset + len(separator) + len(member_json)))
+                offset += len(separator) + len(member_json)
+            ending = b"\n]" if len(self._member_info_list) > 0 else b"[]"
+            member_info_file.write(ending)
+            digest.update(ending)
+            member_info_file.flush()
+            os.fsync(member_info_file.fileno())
+            member_info_file.close()
+        changed = not path.exists(member_info_path) or not filecmp.cmp(temp_path, member_info_path, shallow=False)
+        replaces_member_info = path.abspath(member_info_path) == path.abspath(self._member_info_path)
+        if changed:
+            if replaces_member_info:
+                self._release_snapshot()
+            try:
+                os.replace(temp_path, member_info_path)
+            except OSError:
+                os.remove(temp_path)
+                if replaces_member_info:
+                    self._remap_snapshot()
+                raise
+            fsync_directory(path.dirname(member_info_path))
+        else:
+            os.remove(temp_path)
+        if replaces_member_info:
+            self._snapshot_written(member_ranges)
+            self._write_counters(digest.hexdigest())
+            self._write_binary_snapshot(digest.hexdigest())
+        return changed
+
+    def _snapshot_written(self, member_ranges: List[Tuple[int, int]]):
+        """
+        Called with the byte range of every member after the member info file has been rewritten.
+        """
+        self._release_snapshot()
+        self._member_ranges = member_ranges
+        self._mark_clean()
+
+    def _release_snapshot(self):
+        """
+        Unmap the member info file, which windows cannot replace while it is mapped.
+        """
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    def _remap_snapshot(self):
+        """
+        Called when the member info file released by _release_snapshot was not replaced after all; it is mapped again
+        by _map_snapshot when a dump copies from it.
+        """
+        pass
+
+    def _read_counters(self, snapshot_hash) -> Dict[str, Dict[str, Dict[str, object]]]:
+        """
+        :return: english name -> counters saved alongside the snapshot, or nothing if they belong to another snapshot
+        """
+        if not path.exists(self._counters_path):
+            return {}
+        with open(self._counters_path, "r", encoding="utf-8") as counters_file:
+            try:
+                saved = json.load(counters_file)
+            except ValueError:
+                # a damaged cache, the counters are recounted from the records
+                return {}
+            finally:
+                counters_file.close()
+        if not isinstance(saved, dict) or saved.get("Snapshot Hash") != snapshot_hash:
+            return {}
+        return saved["Members"]
+
+    def _write_counters(self, snapshot_hash):
+        content = json.dumps({
+            "Snapshot Hash": snapshot_hash,
+            "Members": {member_info.english_name: member_info.counters for member_info in self.members}
+        }).encode("utf-8")
+        write_sidecar(self._counters_path, lambda counters_file: counters_file.write(content))
+
+    def check_counters(self) -> List[str]:
+        """
+        Recount every member's counters from the raw records.
+        :return: one line per drifted counter, prefixed by the member's english name
+        """
+        return [
+            "{}: {}".format(member_info.english_name, drift)
+            for member_info in self.members
+            for drift in member_info.counter_drift()
+        ]
+
+    def _journal(self, event: Dict[str, str]):
+        if self._journal_enabled:
+            self._pending_events.append(event)
+
+    def _append_journal(self) -> bool:
+        if len(self._pending_events) == 0:
+            return False
+        with open(self._journal_path, "a", encoding="utf-8") as journal_file:
+            for event in self._pending_events:
+                journal_file.write(json.dumps(event) + "\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+            journal_file.close()
+        self._pending_events.clear()
+        return True
+
+    def _apply_journal(self):
+        journal_enabled, self._journal_enabled = self._journal_enabled, False
+        with open(self._journal_path, "r", encoding="utf-8") as journal_file:
+            for line in journal_file:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if event["Event"] == "Clear":
+                    self.clear_records(event["Date"])
+                elif event["Event"] == "Member":
+                    # a crash between compact writing the snapshot and removing the journal replays this again
+                    if event["English Name"] not in self._english_names:
+                        self._add_member(self._new_member(event["English Name"]))
+                else:
+                    role_taker = self._member(self._english_names[event["English Name"]])
+                    if event["Event"] == "Speech":
+                        role_taker.append_speech(event["Level"], event["Date"], event["Topic"], event["Type"])
+                    else:
+                        role_taker.take_function_role(event["Role"], event["Date"], event["Topic"])
+                    self._index_record_date(self._member_positions[role_taker], event["Date"])
+            journal_file.close()
+        self._journal_enabled = journal_enabled
+
+    def _add_member(self, member_info: MemberInfo):
+        position = len(self._member_info_list)
+        self._member_info_list.append(member_info)
+        self._member_positions[member_info] = position
+        self._register(
+            position,
+            [member_info.english_name, member_info.chinese_name, *member_info.nick_names],
+            member_info.record_dates
+        )
+
+    def _register(self, position: int, names: List[str], record_dates: Iterable[str]):
+        """
+        Index the names and record dates of the member at position, which must be the next one.
+        """
+        self._english_names.setdefault(names[0], position)
+        self._names.append(names)
+        for date_str in record_dates:
+            self._index_record_date(position, date_str)
+        for name in names:
+            self._name_index.add(name, position)
+            if self._fuzzy_index is not None:
+                self._fuzzy_index.add(name, position)
+
+    def _fuzzy(self) -> NameFuzzyIndex:
+        # only built once an unknown name turns up
+        if self._fuzzy_index is None:
+            self._fuzzy_index = NameFuzzyIndex()
+            for position, names in enumerate(self._names):
+                for name in names:
+                    self._fuzzy_index.add(name, position)
+        return self._fuzzy_index
+
+    @property
+    def members(self) -> List[MemberInfo]:
+        return [self._member(position) for position in range(len(self._member_info_list))]
 
-        self._pathway_path = learning_path["pathway"]  # type: List[str]
-        self._cc_path = learning_path["CC"]
+    def members_on(self, date_str) -> List[MemberInfo]:
+        """
+        :return: members holding a role or speech record on date_str, in library order
+        """
+        return [self._member(position) for position in sorted(self._members_by_date.get(date_str, ()))]
 
-    def dump(self, member_info_path=None):
-        with open(self._member_info_path if member_info_path is None else member_info_path, "w", encoding="utf-8"
-                  ) as member_info_file:
-            json.dump(list(map(
-                lambda x: x.to_dict(),
-                self._member_info_list
-            )), member_info_file, indent=2)
+    def members_between(self, first_date_str, end_date_str=None) -> List[MemberInfo]:
+        """
+        :return: members holding a record dated from first_date_str up to, not including, end_date_str
+        """
+        first = bisect.bisect_left(self._record_dates, first_date_str)
+        end = len(self._record_dates) if end_date_str is None else bisect.bisect_left(self._record_dates, end_date_str)
+        positions = set()  # type: Set[int]
+        for record_date in self._record_dates[first:end]:
+            positions.update(self._members_by_date[record_date])
+        return [self._member(position) for position in sorted(positions)]
 
     def find(self, role_taker_name) -> MemberInfo:
         if role_taker_name is not None and len(role_taker_name) is not 0:
-            for member_info in self._member_info_list:
-                for name in [
-                    member_info.english_name,
-                    member_info.chinese_name,
-                    *member_info.nick_names
-                ]:
-                    if name.lower().find(role_taker_name.lower()) is 0:
-                        return member_info
+            position = self._name_index.first_match(role_taker_name)
+            if position is not None:
+                return self._member(position)
+            near_miss = self._resolve_near_miss(role_taker_name)
+            if near_miss is not None:
+                return near_miss
         else:
             return MemberInfo({
                 "English Name": "TBD",
@@ -192,18 +957,91 @@ class MemberInfoLibrary:
                 "Role Records": [],
             })
 
-        role_taker = MemberInfo({
+        role_taker = self._new_member(role_taker_name)
+        self._add_member(role_taker)
+        self._journal({"Event": "Member", "English Name": role_taker_name})
+        return role_taker
+
+    def lookup(self, role_taker_name) -> Optional[MemberInfo]:
+        """
+        :return: the member find would match by name, without adding unknown names to the library
+        """
+        if role_taker_name is None or len(role_taker_name) == 0:
+            return None
+        position = self._name_index.first_match(role_taker_name)
+        return self._member(position) if position is not None else None
+
+    @classmethod
+    def _new_member(cls, role_taker_name):
+        return MemberInfo({
             "English Name": role_taker_name,
             "Chinese Name": role_taker_name,
             "Speech Records": [],
             "Role Records": [],
         })
-        self._member_info_list.append(role_taker)
-        return role_taker
+
+    def suggest(self, role_taker_name: str, max_distance=None) -> List[Tuple[MemberInfo, float]]:
+        suggestions = []
+        for distance, position in self._fuzzy().search(role_taker_name, max_distance):
+            suggestions.append((self._member(position), 1 - distance / len(role_taker_name)))
+        return suggestions
+
+    def resolve(self, role_taker_name) -> Optional[MemberInfo]:
+        """
+        :return: the member find would return, without adding unknown names to the library, or None if find would
+            add one
+        """
+        member_info = self.lookup(role_taker_name)
+        if member_info is None and role_taker_name is not None and len(role_taker_name) != 0:
+            member_info = self._auto_resolved(self.suggest(role_taker_name))
+        return member_info
+
+    def _auto_resolved(self, suggestions: List[Tuple[MemberInfo, float]]) -> Optional[MemberInfo]:
+        if len(suggestions) == 0:
+            return None
+        member_info, confidence = suggestions[0]
+        ambiguous = len(suggestions) > 1 and suggestions[1][1] == confidence
+        if self._auto_resolve_confidence is not None and confidence >= self._auto_resolve_confidence \
+                and not ambiguous:
+            return member_info
+        return None
+
+    def _resolve_near_miss(self, role_taker_name: str) -> Optional[MemberInfo]:
+        """
+        :return: the member an unknown name auto-resolves to, or None if no member comes close, so it is a new one
+        :raise UnknownMemberError: if members come close but none confidently enough
+        """
+        suggestions = self.suggest(role_taker_name)
+        if len(suggestions) == 0:
+            return None
+        member_info = self._auto_resolved(suggestions)
+        if member_info is not None:
+            confidence = suggestions[0][1]
+            print("Resolved unknown member \"{}\" to \"{}\" (confidence {:.2f})".format(
+                role_taker_name, member_info.english_name, confidence))
+            return member_info
+        raise UnknownMemberError(role_taker_name, [suggestion.english_name for suggestion, _ in suggestions[:3]])
+
+    def _index_record_date(self, position: int, date_str: str):
+        if date_str not in self._members_by_date:
+            bisect.insort(self._record_dates, date_str)
+            self._members_by_date[date_str] = set()
+        self._members_by_date[date_str].add(position)
 
     def clear_records(self, date_str):
-        for member in self._member_info_list:
-            member.clear_records(date_str)
+        """
+        Drop every record on or after date_str. Members holding such records get the level of their last speech
+        left; the others keep their current level, even one set by hand in the member info file.
+        """
+        self._journal({"Event": "Clear", "Date": date_str})
+        index = bisect.bisect_left(self._record_dates, date_str)
+        affected = set()  # type: Set[int]
+        for record_date in self._record_dates[index:]:
+            affected.update(self._members_by_date.pop(record_date))
+        del self._record_dates[index:]
+
+        for position in sorted(affected):
+            self._member(position).clear_records(date_str)
 
     def next_level(self, current_level: str):
         if current_level in self._pathway_path:
@@ -216,11 +1054,171 @@ class MemberInfoLibrary:
         if role_name.find("Speaker") is 0:
             speech_type, next_level = self.next_level(role_taker.current_level)
             role_taker.append_speech(next_level, date_str, topic, speech_type)
+            event = {
+                "Event": "Speech",
+                "English Name": role_taker.english_name,
+                "Level": next_level,
+                "Date": date_str,
+                "Topic": topic,
+                "Type": speech_type
+            }
+        elif role_taker.take_function_role(role_name, date_str, topic):
+            event = {
+                "Event": "Role",
+                "English Name": role_taker.english_name,
+                "Role": role_name,
+                "Date": date_str,
+                "Topic": topic
+            }
         else:
-            role_taker.take_function_role(role_name, date_str, topic)
+            return role_taker
+        if role_taker in self._member_positions:
+            self._index_record_date(self._member_positions[role_taker], date_str)
+            self._journal(event)
         return role_taker
 
 
+class LazyMemberInfoLibrary(MemberInfoLibrary):
+    """
+    MemberInfoLibrary that memory-maps the member info file and only parses the members that are looked up.
+
+    A sidecar index, keyed by the size and modification time of the file, keeps the byte range, names and last
+    record date of every member; it is rebuilt from a full parse when stale. Members never looked up are copied to
+    dumps byte for byte, and clear_records only parses members with records on or after the cleared date.
+    """
+    def _load(self):
+        self._index_path = path.splitext(self._member_info_path)[0] + ".index.json"
+        self._member_ranges = []  # type: List[Tuple[int, int]]
+        self._last_dates = []  # type: List[int]
+        self._remap_snapshot()
+
+        entries = self._read_index()
+        if entries is None:
+            entries = self._build_index()
+            self._write_index(entries)
+        for position, (start, end, last_date, names) in enumerate(entries):
+            self._member_info_list.append(None)
+            self._member_ranges.append((start, end))
+            self._register(position, names, [str(last_date)] if last_date > 0 else [])
+
+    def _read_index(self) -> Optional[List[list]]:
+        if not path.exists(self._index_path):
+            return None
+        with open(self._index_path, "r", encoding="utf-8") as index_file:
+            try:
+                index = json.load(index_file)
+            except ValueError:
+                # a damaged index is rebuilt like a stale one
+                return None
+            finally:
+                index_file.close()
+        stat = os.stat(self._member_info_path)
+        if not isinstance(index, dict) or index.get("Size") != stat.st_size \
+                or index.get("Modified") != stat.st_mtime_ns:
+            return None
+        return index["Members"]
+
+    def _write_index(self, entries: List[list]):
+        stat = os.stat(self._member_info_path)
+        content = json.dumps({"Size": stat.st_size, "Modified": stat.st_mtime_ns, "Members": entries}).encode("utf-8")
+        write_sidecar(self._index_path, lambda index_file: index_file.write(content))
+
+    @classmethod
+    def _index_entry(cls, start: int, end: int, member_info_json) -> list:
+        record_dates = [int(record["Date"]) for record in member_info_json["Role Records"]]
+        record_dates.extend(int(record["Date"]) for record in member_info_json["Speech Records"])
+        names = [member_info_json["English Name"], member_info_json["Chinese Name"]]
+        names.extend(member_info_json.get("Nick Names") or [])
+        return [start, end, max(record_dates) if len(record_dates) > 0 else 0, names]
+
+    def _build_index(self) -> List[list]:
+        """
+        Parse the whole file once, member by member, to find the byte range of each.
+        """
+        return [
+            self._index_entry(start, end, member_info_json)
+            for start, end, member_info_json in scan_member_list(self._snapshot, self._member_info_path)
+        ]
+
+    def _member(self, position: int) -> MemberInfo:
+        member_info = self._member_info_list[position]
+        if member_info is None:
+            start, end = self._member_ranges[position]
+            member_info_json = json.loads(self._snapshot[start:end].decode("utf-8"))
+            member_info = MemberInfo(member_info_json)
+            # stored before the mentor is looked up, so a mentor cycle ends here
+            self._member_info_list[position] = member_info
+            self._member_positions[member_info] = position
+            if member_info_json.get("Mentor Name") is not None:
+                member_info.set_mentor(member_info_json["Mentor Name"], self)
+            self._clean_revisions[position] = member_info.revision
+        return member_info
+
+    def _member_json(self, position: int, changed_only=False) -> bytes:
+        if self._member_info_list[position] is None:
+            start, end = self._member_ranges[position]
+            return self._snapshot[start:end]
+        return super()._member_json(position, changed_only)
+
+    def _map_snapshot(self) -> bool:
+        # mapped on load, unparsed members are copied from it either way
+        stat = os.stat(self._member_info_path)
+        return (stat.st_size, stat.st_mtime_ns) == self._snapshot_state
+
+    def _snapshot_written(self, member_ranges: List[Tuple[int, int]]):
+        super()._snapshot_written(member_ranges)
+        # members not parsed yet are now read from the file just written
+        self._remap_snapshot()
+        self._write_index([
+            [start, end, self._last_dates[position], self._names[position]]
+            for position, (start, end) in enumerate(member_ranges)
+        ])
+
+    def _remap_snapshot(self):
+        # members not parsed yet are read from the mapping
+        with open(self._member_info_path, "rb") as member_info_file:
+            self._snapshot = mmap.mmap(member_info_file.fileno(), 0, access=mmap.ACCESS_READ)
+            member_info_file.close()
+
+    def _write_counters(self, snapshot_hash):
+        # saving counters would parse every member; lazily parsed members count their own records
+        pass
+
+    def _write_binary_snapshot(self, snapshot_hash):
+        # the index already spares the parse the binary snapshot would
+        pass
+
+    def _register(self, position: int, names: List[str], record_dates: Iterable[str]):
+        self._last_dates.append(0)
+        super()._register(position, names, record_dates)
+
+    def _index_record_date(self, position: int, date_str: str):
+        self._last_dates[position] = max(self._last_dates[position], int(date_str))
+
+    def members_on(self, date_str) -> List[MemberInfo]:
+        return [
+            self._member(position) for position, last_date in enumerate(self._last_dates)
+            if last_date >= int(date_str) and date_str in self._member(position).record_dates
+        ]
+
+    def members_between(self, first_date_str, end_date_str=None) -> List[MemberInfo]:
+        return [
+            self._member(position) for position, last_date in enumerate(self._last_dates)
+            if last_date >= int(first_date_str) and any(
+                first_date_str <= record_date and (end_date_str is None or record_date < end_date_str)
+                for record_date in self._member(position).record_dates
+            )
+        ]
+
+    def clear_records(self, date_str):
+        self._journal({"Event": "Clear", "Date": date_str})
+        for position, last_date in enumerate(self._last_dates):
+            if last_date >= int(date_str):
+                member_info = self._member(position)
+                member_info.clear_records(date_str)
+                self._last_dates[position] = max(map(int, member_info.record_dates), default=0)
+
+
 if __name__ == "__main__":
     member_lib = MemberInfoLibrary()
     user = member_lib.find("Elliot")
@@ -0,0 +1,122 @@
+import csv
+import json
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, TextIO
+from member import MemberInfo, MemberInfoLibrary, role_code, role_name
+
+
+ROLE_COLUMNS = ["Toastmaster", "GE", "TTM", "TTE", "Word Smith", "Ah Counter", "Timer", "IE"]
+GROUP_COLUMNS = {"member": "Name", "mentor": "Mentor Name", "level": "Current Level"}
+
+
+class MemberStatistics:
+    """
+    All role and speech records of a library gathered into flat columns once, so that any report is a single
+    grouped count over them rather than a scan of every member's records per role.
+    """
+    def __init__(self, member_lib: MemberInfoLibrary):
+        self._members = member_lib.members  # type: List[MemberInfo]
+        self._role_members = array("i")
+        self._role_codes = array("H")
+        self._role_dates = array("i")
+        self._speech_members = array("i")
+        self._speech_dates = array("i")
+        for i, member in enumerate(self._members):
+            dates, codes = member.role_columns
+            self._role_members.extend([i] * len(dates))
+            self._role_codes.extend(codes)
+            self._role_dates.extend(dates)
+            dates, _ = member.speech_columns
+            self._speech_members.extend([i] * len(dates))
+            self._speech_dates.extend(dates)
+
+    def group_of(self, member: MemberInfo, group_by: str) -> str:
+        if group_by == "member":
+            return member.english_name
+        if group_by == "mentor":
+            return member.mentor.english_name if member.mentor is not None else ""
+        if group_by == "level":
+            return member.current_level
+        raise ValueError("unknown grouping \"{}\", expected one of {}".format(group_by, ", ".join(GROUP_COLUMNS)))
+
+    @classmethod
+    def period_of(cls, date: int, period: Optional[str]) -> str:
+        if period is None:
+            return ""
+        if period == "year":
+            return str(date // 10000)
+        if period == "month":
+            return str(date // 100)
+        raise ValueError("unknown period \"{}\"".format(period))
+
+    def report(self, since=None, until=None, group_by="member", period=None) -> List[Dict[str, object]]:
+        """
+        Count role and speech records dated in [since, until] per group and period, one row per pair.
+
+        The counts differ from the rows of MemberInfo.to_statistics_row in two ways:
+        - the Ah Counter column is named "Ah Counter", the role name the records use, rather than "Ah counter",
+          which matched no record and was always 0;
+        - "Speech" counts the speech records in [since, until], the same range as the role columns, rather than the
+          speech records after 20200901 next to role counts over all time; since="20200902" gives the old "Speech"
+          column, with no since the role columns match the old ones.
+
+        :param group_by: "member", "mentor" or "level" (the member's current level)
+        :param period: None for totals, "year" or "month"
+        """
+        first = int(since) if since is not None else 0
+        last = int(until) if until is not None else 99999999
+        groups = [self.group_of(member, group_by) for member in self._members]
+
+        role_counts = Counter(
+            (groups[member], self.period_of(date, period), code)
+            for member, code, date in zip(self._role_members, self._role_codes, self._role_dates)
+            if first <= date <= last
+        )
+        speech_counts = Counter(
+            (groups[member], self.period_of(date, period))
+            for member, date in zip(self._speech_members, self._speech_dates)
+            if first <= date <= last
+        )
+
+        roles = list(ROLE_COLUMNS)
+        roles += sorted({role_name(code) for _, _, code in role_counts} - set(ROLE_COLUMNS))
+        keys = {(group, period_key) for group, period_key, _ in role_counts} | set(speech_counts)
+        if period is None:
+            # every group shows up in a total report, even without records in the range
+            keys |= {(group, "") for group in groups}
+
+        first_members = {}  # type: Dict[str, MemberInfo]
+        for group, member in zip(groups, self._members):
+            first_members.setdefault(group, member)
+
+        rows = []
+        for group, period_key in sorted(keys):
+            row = {}  # type: Dict[str, object]
+            if group_by == "member":
+                member = first_members[group]
+                row["Mentor Name"] = member.mentor.english_name if member.mentor is not None else None
+                row["Name"] = group
+                row["Current Level"] = member.current_level
+            else:
+                row[GROUP_COLUMNS[group_by]] = group
+            if period is not None:
+                row["Period"] = period_key
+            row["Speech"] = speech_counts[(group, period_key)]
+            for role in roles:
+                row[role] = role_counts[(group, period_key, role_code(role))]
+            rows.append(row)
+        return rows
+
+    @classmethod
+    def write_csv(cls, rows: List[Dict[str, object]], stream: TextIO):
+        if len(rows) == 0:
+            return
+        writer = csv.DictWriter(stream, fieldnames=list(rows[0]), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+    @classmethod
+    def write_json(cls, rows: List[Dict[str, object]], stream: TextIO):
+        json.dump(rows, stream, indent=2, ensure_ascii=False)
+        stream.write("\n")
@@ -0,0 +1,352 @@
+import json
+import sqlite3
+import sys
+from os import path
+from typing import Dict, List, Optional, Tuple
+from member import LazyMemberInfoLibrary, MemberInfo, MemberInfoLibrary
+from name_index import NameFuzzyIndex
+from club_context import ClubContext
+from build_cache import write_if_changed
+
+
+SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+# sorts after every other code point, so [prefix, prefix + PREFIX_END) is the range of names starting with prefix
+PREFIX_END = "\U0010ffff"
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    id INTEGER PRIMARY KEY,
+    english_name TEXT NOT NULL,
+    chinese_name TEXT NOT NULL,
+    mentor_name TEXT,
+    current_level TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    member_id INTEGER NOT NULL REFERENCES members(id),
+    kind TEXT NOT NULL,
+    ordinal INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    folded TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS role_records (
+    id INTEGER PRIMARY KEY,
+    member_id INTEGER NOT NULL REFERENCES members(id),
+    date INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    topic TEXT,
+    has_topic INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS speech_records (
+    id INTEGER PRIMARY KEY,
+    member_id INTEGER NOT NULL REFERENCES members(id),
+    date INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    topic TEXT,
+    type TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS aliases_folded ON aliases(folded, member_id);
+CREATE INDEX IF NOT EXISTS aliases_member ON aliases(member_id, kind, ordinal);
+CREATE INDEX IF NOT EXISTS role_records_member_date ON role_records(member_id, date);
+CREATE INDEX IF NOT EXISTS role_records_role_date ON role_records(role, date);
+CREATE INDEX IF NOT EXISTS role_records_date ON role_records(date);
+CREATE INDEX IF NOT EXISTS speech_records_member_date ON speech_records(member_id, date);
+CREATE INDEX IF NOT EXISTS speech_records_date ON speech_records(date);
+"""
+
+
+class SqliteMemberLibrary:
+    """
+    MemberInfoLibrary kept in a SQLite database instead of one JSON file. Members are read on demand and cached as
+    MemberInfo objects, every change is written through to both, and the changes of a meeting, from its
+    clear_records to the next clear_records or dump, are committed as one transaction. Mentors set on the cached
+    members are written when the transaction is committed.
+
+    Member ids are the positions in the JSON member list and records of the same date keep their insertion order,
+    so export_json writes back exactly what import_json read.
+    """
+    def __init__(self, database_path, auto_resolve_confidence=None, club=None):
+        self._database_path = database_path
+        self._auto_resolve_confidence = auto_resolve_confidence
+        self._connection = sqlite3.connect(database_path)
+        self._connection.executescript(SCHEMA)
+        self._members = {}  # type: Dict[int, MemberInfo]
+        self._member_ids = {}  # type: Dict[MemberInfo, int]
+        # member id -> mentor name in the database, for the cached members
+        self._mentor_names = {}  # type: Dict[int, Optional[str]]
+        self._fuzzy_index = None  # type: Optional[NameFuzzyIndex]
+        # rows changed when the library was opened or last dumped
+        self._dumped_changes = self._connection.total_changes
+
+        learning_path = (ClubContext.default() if club is None else club).config.get("learning_path")
+        self._pathway_path = learning_path["pathway"]  # type: List[str]
+        self._cc_path = learning_path["CC"]
+
+    next_level = MemberInfoLibrary.next_level
+    _resolve_near_miss = MemberInfoLibrary._resolve_near_miss
+    _auto_resolved = MemberInfoLibrary._auto_resolved
+    resolve = MemberInfoLibrary.resolve
+
+    def close(self):
+        self._write_mentors()
+        self._connection.commit()
+        self._connection.close()
+
+    def _write_mentors(self):
+        for member_id, member_info in self._members.items():
+            mentor_name = member_info.mentor.english_name if member_info.mentor is not None else None
+            if self._mentor_names.get(member_id) != mentor_name:
+                self._connection.execute("UPDATE members SET mentor_name = ? WHERE id = ?", (mentor_name, member_id))
+                self._mentor_names[member_id] = mentor_name
+
+    def _member(self, member_id: int) -> MemberInfo:
+        if member_id in self._members:
+            return self._members[member_id]
+        english_name, chinese_name, mentor_name, current_level = self._connection.execute(
+            "SELECT english_name, chinese_name, mentor_name, current_level FROM members WHERE id = ?", (member_id,)
+        ).fetchone()
+        nick_names = [name for name, in self._connection.execute(
+            "SELECT name FROM aliases WHERE member_id = ? AND kind = 'nick' ORDER BY ordinal", (member_id,)
+        )]
+        role_records = []
+        for date, role, topic, has_topic in self._connection.execute(
+            "SELECT date, role, topic, has_topic FROM role_records WHERE member_id = ? ORDER BY date, id",
+            (member_id,)
+        ):
+            record = {"Role": role, "Date": str(date)}
+            if has_topic:
+                record["Topic"] = topic
+            role_records.append(record)
+        speech_records = [
+            {"Level": level, "Date": str(date), "Topic": topic, "Type": speech_type}
+            for date, level, topic, speech_type in self._connection.execute(
+                "SELECT date, level, topic, type FROM speech_records WHERE member_id = ? ORDER BY date, id",
+                (member_id,)
+            )
+        ]
+        member_info = MemberInfo({
+            "English Name": english_name,
+            "Chinese Name": chinese_name,
+            "Nick Names": nick_names,
+            "Current Level": current_level,
+            "Role Records": role_records,
+            "Speech Records": speech_records
+        })
+        # cached before the mentor is looked up, so mentor cycles end here
+        self._members[member_id] = member_info
+        self._member_ids[member_info] = member_id
+        self._mentor_names[member_id] = mentor_name
+        if mentor_name is not None:
+            member_info.set_mentor(mentor_name, self)
+        return member_info
+
+    def _insert_member(self, member_id: int, member_info: MemberInfo, mentor_name: Optional[str]):
+        self._connection.execute(
+            "INSERT INTO members (id, english_name, chinese_name, mentor_name, current_level) VALUES (?, ?, ?, ?, ?)",
+            (member_id, member_info.english_name, member_info.chinese_name, mentor_name, member_info.current_level)
+        )
+        self._mentor_names[member_id] = mentor_name
+        aliases = [("english", 0, member_info.english_name), ("chinese", 0, member_info.chinese_name)]
+        aliases.extend(("nick", i, name) for i, name in enumerate(member_info.nick_names))
+        self._connection.executemany(
+            "INSERT INTO aliases (member_id, kind, ordinal, name, folded) VALUES (?, ?, ?, ?, ?)",
+            [(member_id, kind, ordinal, name, name.lower()) for kind, ordinal, name in aliases]
+        )
+        self._connection.executemany(
+            "INSERT INTO role_records (member_id, date, role, topic, has_topic) VALUES (?, ?, ?, ?, ?)",
+            [
+                (member_id, int(record["Date"]), record["Role"], record.get("Topic"), "Topic" in record)
+                for record in member_info.role_records
+            ]
+        )
+        self._connection.executemany(
+            "INSERT INTO speech_records (member_id, date, level, topic, type) VALUES (?, ?, ?, ?, ?)",
+            [
+                (member_id, int(record["Date"]), record["Level"], record["Topic"], record["Type"])
+                for record in member_info.speech_records
+            ]
+        )
+        if self._fuzzy_index is not None:
+            for _, _, name in aliases:
+                self._fuzzy_index.add(name, member_id)
+
+    def import_json(self, member_info_path):
+        """
+        Replace the whole database with the members of a JSON member info file, in one transaction.
+        """
+        with open(member_info_path, "r", encoding="utf-8") as member_info_file:
+            member_info_list = json.load(member_info_file)
+            member_info_file.close()
+        with self._connection:
+            for table in ["aliases", "role_records", "speech_records", "members"]:
+                self._connection.execute("DELETE FROM {}".format(table))
+            for member_id, member_info_json in enumerate(member_info_list):
+                self._insert_member(member_id, MemberInfo(member_info_json), member_info_json.get("Mentor Name"))
+        self._members.clear()
+        self._member_ids.clear()
+        self._mentor_names.clear()
+        self._fuzzy_index = None
+
+    def export_json(self, member_info_path) -> bool:
+        """
+        :return: whether the file changed
+        """
+        return write_if_changed(member_info_path, json.dumps(list(map(
+            lambda x: x.to_dict(),
+            self.members
+        )), indent=2).encode("utf-8"))
+
+    def dump(self, member_info_path=None, changed_only=False) -> bool:
+        """
+        Commit the pending meeting, and with a path also export the library there in the JSON format.
+        :param changed_only: unused, commits only ever write the changed rows
+        :return: whether any row changed since the library was opened or last dumped, or the exported file changed
+        """
+        self._write_mentors()
+        self._connection.commit()
+        changed = self._connection.total_changes != self._dumped_changes
+        self._dumped_changes = self._connection.total_changes
+        if member_info_path is not None:
+            changed |= self.export_json(member_info_path)
+        return changed
+
+    def compact(self, changed_only=False):
+        self._write_mentors()
+        self._connection.commit()
+        self._connection.execute("VACUUM")
+
+    @property
+    def members(self) -> List[MemberInfo]:
+        return [self._member(member_id) for member_id, in self._connection.execute("SELECT id FROM members ORDER BY id")]
+
+    def members_on(self, date_str) -> List[MemberInfo]:
+        return [self._member(member_id) for member_id, in self._connection.execute(
+            "SELECT member_id FROM role_records WHERE date = ? UNION SELECT member_id FROM speech_records WHERE date = ?"
+            " ORDER BY member_id", (int(date_str), int(date_str))
+        )]
+
+    def members_between(self, first_date_str, end_date_str=None) -> List[MemberInfo]:
+        condition, parameters = "date >= ?", [int(first_date_str)]
+        if end_date_str is not None:
+            condition += " AND date < ?"
+            parameters.append(int(end_date_str))
+        return [self._member(member_id) for member_id, in self._connection.execute(
+            "SELECT member_id FROM role_records WHERE {0} UNION SELECT member_id FROM speech_records WHERE {0}"
+            " ORDER BY member_id".format(condition),
+            parameters * 2
+        )]
+
+    def find(self, role_taker_name) -> MemberInfo:
+        if role_taker_name is not None and len(role_taker_name) != 0:
+            folded = role_taker_name.lower()
+            row = self._connection.execute(
+                "SELECT MIN(member_id) FROM aliases WHERE folded >= ? AND folded < ?", (folded, folded + PREFIX_END)
+            ).fetchone()
+            if row[0] is not None:
+                return self._member(row[0])
+            near_miss = self._resolve_near_miss(role_taker_name)
+            if near_miss is not None:
+                return near_miss
+        else:
+            return MemberInfo({
+                "English Name": "TBD",
+                "Chinese Name": "TBD",
+                "Speech Records": [],
+                "Role Records": [],
+            })
+
+        member_id, = self._connection.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM members").fetchone()
+        role_taker = MemberInfoLibrary._new_member(role_taker_name)
+        self._insert_member(member_id, role_taker, None)
+        self._members[member_id] = role_taker
+        self._member_ids[role_taker] = member_id
+        return role_taker
+
+    def lookup(self, role_taker_name) -> Optional[MemberInfo]:
+        if role_taker_name is None or len(role_taker_name) == 0:
+            return None
+        folded = role_taker_name.lower()
+        member_id, = self._connection.execute(
+            "SELECT MIN(member_id) FROM aliases WHERE folded >= ? AND folded < ?", (folded, folded + PREFIX_END)
+        ).fetchone()
+        return self._member(member_id) if member_id is not None else None
+
+    def suggest(self, role_taker_name: str, max_distance=None) -> List[Tuple[MemberInfo, float]]:
+        if self._fuzzy_index is None:
+            self._fuzzy_index = NameFuzzyIndex()
+            for member_id, name in self._connection.execute("SELECT member_id, name FROM aliases ORDER BY rowid"):
+                self._fuzzy_index.add(name, member_id)
+        return [
+            (self._member(member_id), 1 - distance / len(role_taker_name))
+            for distance, member_id in self._fuzzy_index.search(role_taker_name, max_distance)
+        ]
+
+    def clear_records(self, date_str):
+        """
+        Drop every record on or after date_str, starting the transaction of the meeting held that day. As in
+        MemberInfoLibrary, only the members holding such records have their current level reset.
+        """
+        self._write_mentors()
+        self._connection.commit()
+        affected = [member_id for member_id, in self._connection.execute(
+            "SELECT member_id FROM role_records WHERE date >= ? UNION SELECT member_id FROM speech_records"
+            " WHERE date >= ?", (int(date_str), int(date_str))
+        )]
+        self._connection.execute("DELETE FROM role_records WHERE date >= ?", (int(date_str),))
+        self._connection.execute("DELETE FROM speech_records WHERE date >= ?", (int(date_str),))
+        for member_id in affected:
+            member_info = self._member(member_id)
+            member_info.clear_records(date_str)
+            self._connection.execute(
+                "UPDATE members SET current_level = ? WHERE id = ?", (member_info.current_level, member_id)
+            )
+
+    def assign_role(self, role_taker_name: str, role_name: str, date_str, topic) -> MemberInfo:
+        role_taker = self.find(role_taker_name)
+        member_id = self._member_ids.get(role_taker)
+        if role_name.find("Speaker") == 0:
+            speech_type, next_level = self.next_level(role_taker.current_level)
+            role_taker.append_speech(next_level, date_str, topic, speech_type)
+            if member_id is not None:
+                self._connection.execute(
+                    "INSERT INTO speech_records (member_id, date, level, topic, type) VALUES (?, ?, ?, ?, ?)",
+                    (member_id, int(date_str), next_level, topic, speech_type)
+                )
+                self._connection.execute(
+                    "UPDATE members SET current_level = ? WHERE id = ?", (role_taker.current_level, member_id)
+                )
+        elif role_taker.take_function_role(role_name, date_str, topic) and member_id is not None:
+            has_topic = role_name in ["TTM", "Toastmaster"]
+            self._connection.execute(
+                "INSERT INTO role_records (member_id, date, role, topic, has_topic) VALUES (?, ?, ?, ?, ?)",
+                (member_id, int(date_str), role_name, topic if has_topic else None, has_topic)
+            )
+        return role_taker
+
+
+def open_member_library(member_info_path=None, lazy=False, **options):
+    """
+    :param lazy: for a JSON file, only parse the members that are looked up (see LazyMemberInfoLibrary)
+    :return: a SqliteMemberLibrary for a SQLite database path, otherwise a MemberInfoLibrary with the given options
+    """
+    if member_info_path is not None and path.splitext(member_info_path)[1].lower() in SQLITE_EXTENSIONS:
+        return SqliteMemberLibrary(member_info_path, options.get("auto_resolve_confidence"), options.get("club"))
+    if lazy:
+        return LazyMemberInfoLibrary(member_info_path, **options)
+    return MemberInfoLibrary(member_info_path, **options)
+
+
+def __main__():
+    if len(sys.argv) != 4 or sys.argv[1] not in ["import", "export"]:
+        print("usage: member_store.py import <member_info.json> <members.sqlite>\n"
+              "       member_store.py export <members.sqlite> <member_info.json>")
+        sys.exit(1)
+    if sys.argv[1] == "import":
+        library = SqliteMemberLibrary(sys.argv[3])
+        library.import_json(sys.argv[2])
+    else:
+        library = SqliteMemberLibrary(sys.argv[2])
+        library.export_json(sys.argv[3])
+    library.close()
+
+
+if __name__ == "__main__":
+    __main__()
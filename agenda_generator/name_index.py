@@ -0,0 +1,132 @@
+from typing import Dict, List, Optional, Tuple
+
+
+class _TrieNode:
+    __slots__ = ["children", "first"]
+
+    def __init__(self, first):
+        self.children = {}  # type: Dict[str, _TrieNode]
+        self.first = first
+
+
+class NamePrefixIndex:
+    """
+    Case-folded prefix index over member names.
+
+    Every node remembers the smallest member position whose names pass through it, so a lookup returns the same
+    member as a linear scan over the member list in order, at the cost of the length of the queried name.
+    """
+    def __init__(self):
+        self._root = _TrieNode(None)
+
+    def add(self, name: str, position: int):
+        node = self._root
+        for char in name.lower():
+            child = node.children.get(char)
+            if child is None:
+                child = _TrieNode(position)
+                node.children[char] = child
+            elif child.first > position:
+                child.first = position
+            node = child
+
+    def first_match(self, prefix: str) -> Optional[int]:
+        node = self._root
+        for char in prefix.lower():
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node.first
+
+
+def bounded_distance(word1: str, word2: str, limit: int, prefix=False) -> int:
+    """
+    Banded variant of member.min_distance that gives up as soon as the distance exceeds limit, in which case
+    limit + 1 is returned. With prefix=True word1 is compared against the closest prefix of word2.
+    """
+    too_far = limit + 1
+    if prefix:
+        word2 = word2[:len(word1) + limit]
+    elif abs(len(word1) - len(word2)) > limit:
+        return too_far
+
+    previous_row = [index2 if index2 <= limit else too_far for index2 in range(len(word2) + 1)]
+    for index1 in range(1, len(word1) + 1):
+        current_row = [too_far] * (len(word2) + 1)
+        current_row[0] = index1 if index1 <= limit else too_far
+        row_min = current_row[0]
+        char1 = word1[index1 - 1]
+        for index2 in range(max(1, index1 - limit), min(len(word2), index1 + limit) + 1):
+            distance = min(
+                previous_row[index2 - 1] + (char1 != word2[index2 - 1]),
+                previous_row[index2] + 1,
+                current_row[index2 - 1] + 1,
+                too_far
+            )
+            current_row[index2] = distance
+            if distance < row_min:
+                row_min = distance
+        if row_min > limit:
+            return too_far
+        previous_row = current_row
+
+    distance = min(previous_row) if prefix else previous_row[-1]
+    return distance if distance <= limit else too_far
+
+
+class NameFuzzyIndex:
+    """
+    Bigram candidate index over member names for typo-tolerant lookups.
+
+    Names are padded with a leading "^" and split into bigrams. A single edit destroys at most two bigrams of the
+    query, so only names sharing at least len(query) - 2 * limit bigrams are verified with bounded_distance.
+    """
+    def __init__(self):
+        self._names = []  # type: List[Tuple[str, int]]
+        self._postings = {}  # type: Dict[str, List[Tuple[int, int]]]
+
+    @classmethod
+    def bigram_counts(cls, name: str) -> Dict[str, int]:
+        padded = "^" + name
+        counts = {}  # type: Dict[str, int]
+        for i in range(len(padded) - 1):
+            gram = padded[i:i + 2]
+            counts[gram] = counts.get(gram, 0) + 1
+        return counts
+
+    @classmethod
+    def default_limit(cls, query: str) -> int:
+        return 2 if len(query) >= 8 else 1
+
+    def add(self, name: str, position: int):
+        name = name.lower()
+        entry = len(self._names)
+        self._names.append((name, position))
+        for gram, count in self.bigram_counts(name).items():
+            self._postings.setdefault(gram, []).append((entry, count))
+
+    def search(self, query: str, limit=None) -> List[Tuple[int, int]]:
+        """
+        :return: (distance, position) pairs of members with a name prefix within limit edits of query, closest first
+        """
+        query = query.lower()
+        if limit is None:
+            limit = self.default_limit(query)
+        required = len(query) - 2 * limit
+        if required <= 0:
+            return []
+
+        shared = {}  # type: Dict[int, int]
+        for gram, count in self.bigram_counts(query).items():
+            for entry, entry_count in self._postings.get(gram, ()):
+                shared[entry] = shared.get(entry, 0) + min(count, entry_count)
+
+        best = {}  # type: Dict[int, int]
+        for entry, shared_count in shared.items():
+            if shared_count < required:
+                continue
+            name, position = self._names[entry]
+            distance = bounded_distance(query, name, limit, prefix=True)
+            if distance <= limit and distance < best.get(position, limit + 1):
+                best[position] = distance
+        return sorted((distance, position) for position, distance in best.items())
@@ -1,13 +1,25 @@
 from os import path
 
 
+_package_dir = path.abspath(path.join(path.abspath(__file__), ".."))
+CONFIG_NAMES = ["learning_path", "roles", "time_dict", "localization"]
+
+
 class PathUtil:
-    def __init__(self):
-        pass
+    def __init__(self, root=None):
+        """
+        :param root: the directory holding a club's data/, config/, templates/, img/, log/ and output/, by default
+            the package directory
+        """
+        self._root = _package_dir if root is None else path.abspath(root)
 
     @property
     def current_dir(self):
-        return path.abspath(path.join(path.abspath(__file__), ".."))
+        return self._root
+
+    @property
+    def package_dir(self):
+        return _package_dir
 
     def get_template(self, name: str):
         return path.join(self.current_dir, "templates", name)
@@ -27,7 +39,7 @@ class PathUtil:
         return path.join(self.current_dir, "output", "agenda.xlsx")
 
     def get_config_path(self, config_name) -> str:
-        assert config_name in ["learning_path", "roles", "time_dict", "localization"]
+        assert config_name in CONFIG_NAMES
         return path.join(self.current_dir, "config", "{}.json".format(config_name))
 
     def get_image(self, name):
@@ -48,3 +60,7 @@ class PathUtil:
     @property
     def default_meeting_info_path(self):
         return path.join(self.current_dir, "data", "meeting.txt")
+
+    @property
+    def default_member_info_path(self):
+        return path.join(self.current_dir, "data", "member_info.json")
@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ["_profiler", "_name", "_args", "_start"]
+
+    def __init__(self, profiler: "Profiler", name: str, args: Optional[Dict[str, object]]):
+        self._profiler = profiler
+        self._name = name
+        self._args = args
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler.record(self._name, self._start, time.perf_counter() - self._start, self._args)
+        return False
+
+
+class Profiler:
+    """
+    Collects completed spans as (name, start, duration, thread id, args), times in seconds.
+    """
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self.events = []  # type: List[Tuple[str, float, float, int, Optional[Dict[str, object]]]]
+
+    def record(self, name: str, start: float, duration: float, args=None):
+        self.events.append((name, start - self._origin, duration, threading.get_ident(), args))
+
+    def to_chrome_trace(self) -> Dict[str, object]:
+        """
+        :return: the spans as complete events of the Chrome trace event format, for chrome://tracing or Perfetto
+        """
+        pid = os.getpid()
+        trace_events = []
+        for name, start, duration, tid, args in self.events:
+            event = {"name": name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": pid, "tid": tid}
+            if args is not None:
+                event["args"] = args
+            trace_events.append(event)
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def summary(self) -> str:
+        """
+        :return: count, total and mean time per span name, slowest total first
+        """
+        totals = {}  # type: Dict[str, List[float]]
+        for name, _, duration, _, _ in self.events:
+            total = totals.setdefault(name, [0, 0])
+            total[0] += 1
+            total[1] += duration
+        lines = ["{:<40}{:>8}{:>14}{:>14}".format("span", "count", "total ms", "mean ms")]
+        for name, (count, duration) in sorted(totals.items(), key=lambda x: -x[1][1]):
+            lines.append("{:<40}{:>8}{:>14.3f}{:>14.3f}".format(name, count, duration * 1e3, duration / count * 1e3))
+        return "\n".join(lines)
+
+
+_profiler = None  # type: Optional[Profiler]
+
+
+def enable() -> Profiler:
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def disable() -> Optional[Profiler]:
+    """
+    :return: the profiler that was collecting spans, if any
+    """
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def span(name: str, args: Optional[Dict[str, object]] = None):
+    """
+    Time a with block as a span named name; a shared no-op context manager while profiling is disabled.
+    """
+    if _profiler is None:
+        return _NULL_SPAN
+    return _Span(_profiler, name, args)
+
+
+def export(trace_path: str) -> str:
+    """
+    Stop profiling, write the Chrome trace of the collected spans to trace_path and return the text summary.
+    """
+    profiler = disable()
+    if profiler is None:
+        return ""
+    with open(trace_path, "w", encoding="utf-8") as trace_file:
+        json.dump(profiler.to_chrome_trace(), trace_file)
+        trace_file.close()
+    return profiler.summary()
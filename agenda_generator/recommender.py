@@ -0,0 +1,175 @@
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from member import MemberInfo, MemberInfoLibrary
+from club_context import ClubContext
+
+
+# where on the learning path (0 just joined, 1 finished) a member best fits each role
+ROLE_EXPERIENCE = {
+    "Toastmaster": 1.0,
+    "GE": 1.0,
+    "TTE": 0.8,
+    "TTM": 0.5,
+    "Timer": 0.0,
+    "Ah Counter": 0.0,
+    "Word Smith": 0.2
+}
+# roles listed in config/roles.json that are not taken by members
+EXTERNAL_ROLES = {"Guest Speaker"}
+# a role last held this many days ago, or never, counts as fully rested
+RECENCY_HORIZON = 365
+
+
+def _ordinal(date_str: str) -> int:
+    return datetime.strptime(str(date_str), "%Y%m%d").toordinal()
+
+
+def min_cost_assignment(costs: List[List[float]]) -> List[int]:
+    """
+    Hungarian algorithm for a rectangular cost matrix with no more rows than columns, O(rows^2 * columns).
+    :return: the column assigned to each row, minimizing the total cost
+    """
+    row_count, column_count = len(costs), len(costs[0]) if len(costs) > 0 else 0
+    if row_count > column_count:
+        raise ValueError("{} rows cannot be assigned to {} columns".format(row_count, column_count))
+    inf = float("inf")
+    # potentials and matching are 1-based, column 0 is the virtual start of each augmenting path
+    row_potential = [0.0] * (row_count + 1)
+    column_potential = [0.0] * (column_count + 1)
+    column_row = [0] * (column_count + 1)
+    way = [0] * (column_count + 1)
+    for row in range(1, row_count + 1):
+        column_row[0] = row
+        column = 0
+        min_slack = [inf] * (column_count + 1)
+        used = [False] * (column_count + 1)
+        while True:
+            used[column] = True
+            current_row, delta, next_column = column_row[column], inf, 0
+            row_costs = costs[current_row - 1]
+            current_potential = row_potential[current_row]
+            for j in range(1, column_count + 1):
+                if not used[j]:
+                    slack = row_costs[j - 1] - current_potential - column_potential[j]
+                    if slack < min_slack[j]:
+                        min_slack[j] = slack
+                        way[j] = column
+                    if min_slack[j] < delta:
+                        delta = min_slack[j]
+                        next_column = j
+            for j in range(column_count + 1):
+                if used[j]:
+                    row_potential[column_row[j]] += delta
+                    column_potential[j] -= delta
+                else:
+                    min_slack[j] -= delta
+            column = next_column
+            if column_row[column] == 0:
+                break
+        while column != 0:
+            previous_column = way[column]
+            column_row[column] = column_row[previous_column]
+            column = previous_column
+
+    assignment = [-1] * row_count
+    for j in range(1, column_count + 1):
+        if column_row[j] != 0:
+            assignment[column_row[j] - 1] = j - 1
+    return assignment
+
+
+class RoleRecommender:
+    """
+    Proposes role takers for an upcoming meeting, favouring members who have not held a role for long, have held it
+    few times and whose learning path progress suits it. Reads only the per-member counters, so each
+    (member, role) score is constant time.
+    """
+    def __init__(self, member_lib: MemberInfoLibrary, recency_weight=0.5, rarity_weight=0.3, fit_weight=0.2,
+                 club=None):
+        self._member_lib = member_lib
+        self._club = ClubContext.default() if club is None else club
+        self._recency_weight = recency_weight
+        self._rarity_weight = rarity_weight
+        self._fit_weight = fit_weight
+        learning_path = self._club.config.get("learning_path")
+        self._progress = {}  # type: Dict[str, float]
+        for path_name in ["pathway", "CC"]:
+            levels = learning_path[path_name]
+            for i, level in enumerate(levels):
+                self._progress[level] = i / (len(levels) - 1)
+        self._ordinals = {}  # type: Dict[str, int]
+
+    def open_roles(self) -> List[str]:
+        return [
+            role["name"] for role in self._club.config.get("roles")
+            if "default_taker" not in role and role["name"] not in EXTERNAL_ROLES
+        ]
+
+    def candidates(self, date_str: str, active_days: int) -> List[MemberInfo]:
+        """
+        :return: members with any role or speech record in the active_days before date_str
+        """
+        first_active = _ordinal(date_str) - active_days
+        candidates = []
+        for member in self._member_lib.members:
+            role_dates, _ = member.role_columns
+            speech_dates, _ = member.speech_columns
+            last_date = max(role_dates[-1] if len(role_dates) > 0 else 0,
+                            speech_dates[-1] if len(speech_dates) > 0 else 0)
+            if last_date > 0 and first_active <= self._date_ordinal(str(last_date)) < _ordinal(date_str):
+                candidates.append(member)
+        return candidates
+
+    def _date_ordinal(self, date_str: str) -> int:
+        if date_str not in self._ordinals:
+            self._ordinals[date_str] = _ordinal(date_str)
+        return self._ordinals[date_str]
+
+    def score(self, member: MemberInfo, role: str, meeting_ordinal: int) -> float:
+        last_date = member.last_role_date(role)
+        if last_date is None:
+            recency = 1.0
+        else:
+            recency = min(meeting_ordinal - self._date_ordinal(last_date), RECENCY_HORIZON) / RECENCY_HORIZON
+        rarity = 1 / (1 + member.role_count(role))
+        fit = 1 - abs(self._progress.get(member.current_level, 0.0) - ROLE_EXPERIENCE.get(role, 0.5))
+        return self._recency_weight * recency + self._rarity_weight * rarity + self._fit_weight * fit
+
+    def recommend(self, date_str: str, roles=None, active_days=180) -> List[Tuple[str, Optional[MemberInfo], float]]:
+        """
+        :param roles: roles to fill, the open roles of config/roles.json if None
+        :return: (role, member or None if there are too few candidates, score) per role
+        """
+        roles = self.open_roles() if roles is None else roles
+        candidates = self.candidates(date_str, active_days)
+        meeting_ordinal = _ordinal(date_str)
+        scores = [[self.score(member, role, meeting_ordinal) for member in candidates] for role in roles]
+        # scores are never negative, so padding columns at cost 0 are only used once candidates run out
+        padding = [0.0] * max(0, len(roles) - len(candidates))
+        assignment = min_cost_assignment([[-score for score in row] + padding for row in scores])
+        return [
+            (role, candidates[column], scores[i][column]) if column < len(candidates) else (role, None, 0.0)
+            for i, (role, column) in enumerate(zip(roles, assignment))
+        ]
+
+
+def recommend_main(args):
+    parser = argparse.ArgumentParser(prog="toastmaster_generator.py recommend",
+                                     description="propose role takers for an upcoming meeting")
+    parser.add_argument("date", help="meeting date, e.g. 20211020")
+    parser.add_argument("--roles", nargs="+", help="roles to fill instead of the open roles of config/roles.json")
+    parser.add_argument("--active-days", type=int, default=180,
+                        help="only members with a record in this many days before the meeting are proposed")
+    parser.add_argument("member_info_path", nargs="?", default=None)
+    options = parser.parse_args(args)
+
+    recommender = RoleRecommender(MemberInfoLibrary(options.member_info_path))
+    for role, member, score in recommender.recommend(options.date, options.roles, options.active_days):
+        if member is None:
+            print("{}: no candidate left".format(role))
+        else:
+            print("{}: {} (last {}, {} time(s), {}, score {:.2f})".format(
+                role, member.english_name, member.last_role_date(role) or "never", member.role_count(role),
+                member.current_level, score
+            ))
@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import os
+import signal
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from member import MemberInfoLibrary
+from club_context import ClubContext
+from agenda import Agenda
+from build_cache import write_if_changed
+from call_role import CallRoleError
+from toastmaster_generator import ToastmasterAgendaGenerator
+
+
+class AgendaService:
+    """
+    Keeps the member library, configs and compiled templates warm between requests. Role assignment runs on the
+    event loop one request at a time, and everything written to disk goes through a single writer task, which does
+    the writing on a worker thread while generations wait for the library.
+    """
+    def __init__(self, member_info_path=None, persist=True, club=None, auto_resolve_confidence=None):
+        self._club = ClubContext.default() if club is None else club
+        self._path_util = self._club.path_util
+        self._member_info_path = member_info_path
+        self._auto_resolve_confidence = auto_resolve_confidence
+        self._persist = persist
+        self._member_info_lib = self._open_library()
+        self._writes = asyncio.Queue()  # type: asyncio.Queue
+        self._library_lock = asyncio.Lock()
+        # (call role text, year, date_str) of the requests whose records are not in the member info file yet, which
+        # without persist is every request served so far
+        self._unsaved = []  # type: List[Tuple[str, Optional[int], Optional[str]]]
+        for language in ["English", "Chinese"]:
+            Agenda.compile_template(self._club, language).pretty_template
+
+    def _open_library(self) -> MemberInfoLibrary:
+        return MemberInfoLibrary(self._member_info_path, self._auto_resolve_confidence, journal=self._persist,
+                                 club=self._club)
+
+    async def run_writer(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            call_role_text, date_strs = await self._writes.get()
+            async with self._library_lock:
+                await loop.run_in_executor(None, self._write, call_role_text, date_strs)
+                # the dump holds every request generated so far
+                self._unsaved.clear()
+            self._writes.task_done()
+
+    def _write(self, call_role_text: str, date_strs: List[str]):
+        for date_str in date_strs:
+            write_if_changed(self._path_util.get_log_path("{0}.call_role.txt".format(date_str)),
+                             call_role_text.encode("utf-8"))
+        self._member_info_lib.dump()
+
+    def _apply(self, call_role_text: str, year=None, date_str=None) -> Tuple[List[str], str]:
+        meetings = ToastmasterAgendaGenerator.read_info_from_call_role(call_role_text, year, "<request>", self._club)
+        if date_str is not None:
+            meetings = [meeting for meeting in meetings if meeting.date_str <= date_str]
+        if len(meetings) == 0:
+            raise ValueError("no meeting found in the call role text")
+
+        html = None
+        for meeting in meetings:
+            self._member_info_lib.clear_records(meeting.date_str)
+            meeting.parse_info(self._member_info_lib)
+            html = meeting.build_agenda().render()
+        return [meeting.date_str for meeting in meetings], html
+
+    def generate(self, call_role_text: str, year=None, date_str=None) -> str:
+        """
+        If the call role text cannot be applied, the library is reloaded from the member info file and the requests
+        not dumped yet are applied again, so the failed request leaves no records behind.
+        :return: the agenda of the last meeting on or before date_str, or of the last meeting in call_role_text
+        """
+        try:
+            date_strs, html = self._apply(call_role_text, year, date_str)
+        except Exception:
+            self._member_info_lib = self._open_library()
+            for request in self._unsaved:
+                self._apply(*request)
+            raise
+        self._unsaved.append((call_role_text, year, date_str))
+        if self._persist:
+            self._writes.put_nowait((call_role_text, date_strs))
+        return html
+
+    async def flush(self):
+        await self._writes.join()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            method, target, headers, body = await self.read_request(reader)
+            url = urlsplit(target)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            if method == "GET" and url.path == "/health":
+                status, content_type, content = 200, "text/plain", "ok"
+            elif method == "POST" and url.path == "/agenda":
+                year = int(query["year"]) if "year" in query else None
+                async with self._library_lock:
+                    html = self.generate(body.decode("utf-8"), year, query.get("date"))
+                status, content_type, content = 200, "text/html", html
+            else:
+                status, content_type, content = 404, "text/plain", "not found"
+        except (CallRoleError, ValueError) as e:
+            status, content_type, content = 400, "text/plain", str(e)
+        except Exception as e:
+            status, content_type, content = 500, "text/plain", repr(e)
+        await self.write_response(writer, status, content_type, content)
+
+    @classmethod
+    async def read_request(cls, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        parts = request_line.split(" ")
+        if len(parts) != 3:
+            raise ValueError("malformed request line \"{}\"".format(request_line))
+        headers = {}  # type: Dict[str, str]
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if len(line) == 0:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", "0")))
+        return parts[0], parts[1], headers, body
+
+    @classmethod
+    async def write_response(cls, writer: asyncio.StreamWriter, status: int, content_type: str, content: str):
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+        payload = content.encode("utf-8")
+        writer.write("HTTP/1.1 {} {}\r\nContent-Type: {}; charset=utf-8\r\nContent-Length: {}\r\n"
+                     "Connection: close\r\n\r\n".format(status, reasons[status], content_type, len(payload))
+                     .encode("latin-1"))
+        writer.write(payload)
+        await writer.drain()
+        writer.close()
+
+
+async def serve(host: str, port: int, member_info_path=None, persist=True, ready: Optional[asyncio.Event] = None,
+                club_root=None, auto_resolve_confidence=None):
+    service = AgendaService(member_info_path, persist, ClubContext.default(club_root), auto_resolve_confidence)
+    writer_task = asyncio.ensure_future(service.run_writer())
+    server = await asyncio.start_server(service.handle, host, port)
+    print("serving agendas on http://{}:{}/agenda".format(host, port))
+    if ready is not None:
+        ready.set()
+    try:
+        # serves until cancelled; Server.serve_forever needs python 3.7 and the app is deployed on 3.6
+        await asyncio.get_event_loop().create_future()
+    finally:
+        server.close()
+        await server.wait_closed()
+        await service.flush()
+        writer_task.cancel()
+
+
+def __main__():
+    parser = argparse.ArgumentParser(description="POST call role text to /agenda to get the rendered agenda")
+    parser.add_argument("--host", default=os.environ.get("HOST", "127.0.0.1"),
+                        help="address to listen on, 0.0.0.0 in a container; the HOST environment variable by default")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--club", dest="club_root", default=None,
+                        help="directory holding the club's data/, config/ and templates/, by default the package one")
+    parser.add_argument("--member-info", dest="member_info_path", default=None)
+    parser.add_argument("--no-persist", dest="persist", action="store_false",
+                        help="keep member records in memory only; a failed request leaves the records of the earlier "
+                             "requests in place")
+    parser.add_argument("--auto-resolve", dest="auto_resolve_confidence", type=float, default=None,
+                        metavar="CONFIDENCE",
+                        help="resolve a misspelled member name to the closest member at this confidence, e.g. 0.8; "
+                             "otherwise the request fails with suggestions")
+    options = parser.parse_args()
+    loop = asyncio.get_event_loop()
+    serving = asyncio.ensure_future(serve(options.host, options.port, options.member_info_path, options.persist,
+                                          club_root=options.club_root,
+                                          auto_resolve_confidence=options.auto_resolve_confidence))
+    # cancelling serve closes the server and flushes the pending writes
+    for signal_number in [signal.SIGINT, signal.SIGTERM]:
+        try:
+            loop.add_signal_handler(signal_number, serving.cancel)
+        except NotImplementedError:
+            # windows has no loop signal handlers, Ctrl+C raises KeyboardInterrupt instead
+            pass
+    try:
+        loop.run_until_complete(serving)
+    except KeyboardInterrupt:
+        serving.cancel()
+        loop.run_until_complete(asyncio.gather(serving, return_exceptions=True))
+    except asyncio.CancelledError:
+        pass
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,5 @@
+import sys
+from os import path
+
+# the modules import each other as siblings, as when run from agenda_generator/
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
@@ -0,0 +1,22 @@
+import os
+import shutil
+import tempfile
+from os import path
+from club_context import ClubContext
+from path_util import PathUtil
+
+
+def make_club(test_case, with_members=True) -> ClubContext:
+    """
+    :return: a club in a temporary directory with the package's configs and template, and its member info file if
+        with_members; the directory is removed when test_case ends
+    """
+    root = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, root, True)
+    package = PathUtil()
+    for directory in ["config", "templates"]:
+        shutil.copytree(path.join(package.current_dir, directory), path.join(root, directory))
+    os.makedirs(path.join(root, "data"))
+    if with_members:
+        shutil.copy(package.default_member_info_path, path.join(root, "data", "member_info.json"))
+    return ClubContext(root)
@@ -0,0 +1,108 @@
+import contextlib
+import io
+import os
+import unittest
+from build_cache import BuildCache
+from toastmaster_generator import ToastmasterAgendaGenerator
+from tests.club_copy import make_club
+
+
+TWO_MEETINGS = """8/4 (English) Microsoft Toastmasters Meeting
+Theme: Resilience
+TM: Fengling
+GE: Bonnie
+Timer: April
+SP1: Serena
+SP1 Topic: Modernization of Small Farmers
+IE1: Brenda
+President: Raymond
+
+8/11 (English) Microsoft Toastmasters Meeting
+Theme: Growth
+TM: Bonnie
+GE: Fengling
+Timer: April
+SP1: Serena
+SP1 Topic: Second speech
+IE1: Raymond
+President: Raymond
+"""
+
+
+class BuildCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.club = make_club(self)
+        # the year is taken from the file name
+        self.call_role_path = os.path.join(self.club.path_util.current_dir, "data", "2021.call_role.txt")
+        self.write_call_role(TWO_MEETINGS)
+
+    def write_call_role(self, text):
+        with open(self.call_role_path, "w", encoding="utf-8") as call_role_file:
+            call_role_file.write(text)
+            call_role_file.close()
+
+    def generate(self, **options):
+        """
+        :return: whether anything changed, and the dates of the meetings skipped
+        """
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            changed = ToastmasterAgendaGenerator(club=self.club).generate_agenda(
+                self.call_role_path, update_member_info=True, jobs=1, **options)
+        skipped = [line.split(":")[0] for line in stdout.getvalue().splitlines() if line.endswith("skipped")]
+        return changed, skipped
+
+    def test_unchanged_meetings_are_skipped(self):
+        self.assertEqual(self.generate(), (True, []))
+        self.assertEqual(self.generate(), (False, ["20210804", "20210811"]))
+
+    def test_config_changes_render_every_meeting_again(self):
+        self.generate()
+        time_dict_path = self.club.path_util.get_config_path("time_dict")
+        with open(time_dict_path, "a", encoding="utf-8") as time_dict_file:
+            time_dict_file.write("\n")
+            time_dict_file.close()
+        self.assertEqual(self.generate()[1], [])
+
+    def test_earlier_records_invalidate_later_meetings(self):
+        self.generate()
+        # Serena's 8/11 speech level depends on whether she spoke on 8/4
+        self.write_call_role(TWO_MEETINGS.replace("SP1: Serena\nSP1 Topic: Modernization",
+                                                  "SP1: Lewis\nSP1 Topic: Modernization"))
+        self.assertEqual(self.generate(), (True, []))
+
+    def test_new_members_are_skipped_on_the_next_run(self):
+        self.write_call_role(TWO_MEETINGS.replace("Timer: April", "Timer: Zorblax Newcomer"))
+        self.assertEqual(self.generate(), (True, []))
+        self.assertEqual(self.generate(), (False, ["20210804", "20210811"]))
+
+    def test_missing_outputs_are_rendered_again(self):
+        self.generate(log_agenda=True)
+        os.remove(self.club.path_util.get_log_path("20210811.agenda.html"))
+        self.assertEqual(self.generate(log_agenda=True), (True, ["20210804"]))
+        self.assertTrue(os.path.exists(self.club.path_util.get_log_path("20210811.agenda.html")))
+
+    def test_cache_entries(self):
+        output_path = self.club.path_util.get_output_path("agenda.html")
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            output_file.write("agenda")
+            output_file.close()
+        cache_path = self.club.path_util.get_output_path("build_cache.json")
+        cache = BuildCache(cache_path, self.club.path_util.current_dir)
+        self.assertFalse(cache.is_fresh("20210804", "inputs", "records"))
+        cache.record("20210804", "inputs", "records", [output_path])
+        self.assertTrue(cache.save())
+        self.assertFalse(cache.save())
+
+        cache = BuildCache(cache_path, self.club.path_util.current_dir)
+        self.assertTrue(cache.is_fresh("20210804", "inputs", "records"))
+        self.assertFalse(cache.is_fresh("20210804", "other inputs", "records"))
+        self.assertFalse(cache.is_fresh("20210804", "inputs", "other records"))
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            output_file.write("edited agenda")
+            output_file.close()
+        self.assertFalse(cache.is_fresh("20210804", "inputs", "records"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import json
+import os
+import unittest
+from member import LazyMemberInfoLibrary, MemberInfoLibrary
+from member_store import SqliteMemberLibrary
+from tests.club_copy import make_club
+
+
+class ClearRecordsTest(unittest.TestCase):
+    def setUp(self):
+        self.club = make_club(self)
+        self.member_info_path = self.club.path_util.default_member_info_path
+        with open(self.member_info_path, "r", encoding="utf-8") as member_info_file:
+            members = json.load(member_info_file)
+            member_info_file.close()
+        # promoted by hand past the last speech record of Lewis, a Level1-1 on 20191204
+        next(member for member in members if member["English Name"] == "Lewis")["Current Level"] = "Level1-3"
+        with open(self.member_info_path, "w", encoding="utf-8") as member_info_file:
+            json.dump(members, member_info_file, indent=2)
+            member_info_file.close()
+
+    def libraries(self):
+        yield MemberInfoLibrary(club=self.club)
+        yield LazyMemberInfoLibrary(club=self.club)
+        database_path = os.path.join(self.club.path_util.current_dir, "data", "members.sqlite")
+        library = SqliteMemberLibrary(database_path, club=self.club)
+        self.addCleanup(lambda: library._connection.close())
+        library.import_json(self.member_info_path)
+        yield library
+
+    def test_only_members_with_cleared_records_reset_their_level(self):
+        for library in self.libraries():
+            with self.subTest(type(library).__name__):
+                library.clear_records("20210728")
+                # Serena gave a Level2-2 speech on 20210728
+                self.assertEqual(library.find("Serena").current_level, "Level2-1")
+                self.assertEqual(library.find("Lewis").current_level, "Level1-3")
+                library.clear_records("20191204")
+                self.assertEqual(library.find("Lewis").current_level, "NotStarted")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import unittest
+from feedback import FeedbackIndex
+from member import MemberInfoLibrary
+from tests.club_copy import make_club
+
+
+CALL_ROLE = """7/28 (English) Microsoft Toastmasters Meeting
+Theme: Resilience
+TM: Fengling
+SP1: 尚哲
+SP1 Topic: Modernization of Small Farmers
+SP2: {}
+SP2 Topic: Ice Breaker
+"""
+
+SURVEY = """"编号","开始答题时间","1.Feedback on our meeting","2.Feedback on Toastmaster","3.Feedback on 1st Speaker",\
+"4.Feedback on 2nd Speaker","5.Feedback on 3rd Speaker"
+"1","28-Jul-2021 21:10:00","well organized","clear transitions","vivid examples","","nobody gave it"
+"2","28-Jul-2021 21:12:00","","","","good eye contact",""
+"""
+
+
+class FeedbackIndexTest(unittest.TestCase):
+    def ingest(self, second_speaker: str, auto_resolve_confidence=None) -> FeedbackIndex:
+        """
+        :param second_speaker: the SP2 name of the call role log, which the speech of Lewis was recorded under
+        """
+        club = make_club(self)
+        library = MemberInfoLibrary(auto_resolve_confidence=auto_resolve_confidence, club=club)
+        library.clear_records("20210728")
+        library.assign_role("Fengling", "Toastmaster", "20210728", "Resilience")
+        library.assign_role("Serena", "Speaker", "20210728", "Modernization of Small Farmers")
+        library.assign_role("Lewis", "Speaker", "20210728", "Ice Breaker")
+        log_dir = club.path_util.get_log_path("")
+        # survey exports are saved with a byte order mark
+        for file_name, content, encoding in [("20210728.call_role.txt", CALL_ROLE.format(second_speaker), "utf-8"),
+                                             ("20210728.csv", SURVEY, "utf-8-sig")]:
+            with open(os.path.join(log_dir, file_name), "w", encoding=encoding, newline="") as log_file:
+                log_file.write(content)
+                log_file.close()
+        index = FeedbackIndex(library, club.path_util)
+        self.assertEqual(index.ingest_all(), 5)
+        return index
+
+    def test_feedback_is_indexed_by_the_member_it_is_about(self):
+        index = self.ingest("Lew")
+        self.assertEqual(index.member_names, ["Fengling Hu", "Lewis", "Serena"])
+        self.assertEqual([entry.text for entry in index.for_member("Serena")], ["vivid examples"])
+        self.assertEqual([entry.subject for entry in index.for_member("Lewis")], ["2nd Speaker"])
+        self.assertEqual([entry.subject for entry in index.for_meeting("20210728")], ["our meeting", "3rd Speaker"])
+
+    def test_speakers_resolve_like_the_generator(self):
+        self.assertEqual(self.ingest("Lewsi", auto_resolve_confidence=0.8).member_names,
+                         ["Fengling Hu", "Lewis", "Serena"])
+        self.assertEqual(self.ingest("Lewsi").member_names, ["Fengling Hu", "Serena"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import contextlib
+import io
+import os
+import shutil
+import unittest
+from datetime import datetime
+from agenda import Agenda, Session
+from html_writer import PrettyTemplate
+from member import MemberInfo, MemberInfoLibrary
+from toastmaster_generator import ToastmasterAgendaGenerator
+from tests.club_copy import make_club
+from tests.test_member_journal import read_bytes
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <style>
+    .row > .column { color: red; }
+  </style>
+  <!-- a comment -->
+</head>
+<body>
+  <p class='quoted "class"'>Theme: <b>{{theme}}</b> &amp; more</p>
+  <img src="qrcode-{{speech_count}}.png"><br>
+  <div id="body"></div>
+  <div>   </div>
+</body>
+</html>
+"""
+
+
+def member(name: str) -> MemberInfo:
+    return MemberInfo({"English Name": name, "Chinese Name": name, "Speech Records": [], "Role Records": []})
+
+
+@unittest.skipIf(BeautifulSoup is None, "needs beautifulsoup4")
+class PrettyTemplateTest(unittest.TestCase):
+    def assert_same_as_prettify(self, html_template: str, values):
+        filled = html_template
+        for key, value in values.items():
+            filled = filled.replace("{{" + key + "}}", value)
+        stream = io.StringIO()
+        PrettyTemplate(html_template).write(stream, values, lambda body_stream, depth: None)
+        self.assertEqual(stream.getvalue(), BeautifulSoup(filled, features="html.parser").prettify())
+
+    def test_template_layout(self):
+        self.assert_same_as_prettify(TEMPLATE, {"theme": "Resilience", "speech_count": "3"})
+
+    def test_package_template(self):
+        club = make_club(self, with_members=False)
+        for language in ["English", "Chinese"]:
+            html_template = Agenda.compile_template(club, language).render({})
+            self.assert_same_as_prettify(html_template, {"theme": "Resilience", "speech_count": "2"})
+
+    def test_agenda_rows(self):
+        club = make_club(self, with_members=False)
+        for theme in ["Resilience", "<i>Growth</i> & \"change\"", ""]:
+            agenda = Agenda("English", theme, 2, club)
+            session = Session(datetime(2021, 7, 28, 18, 45), title="Prepared Speech Session")
+            session.append_event(duration=7, role_name="Prepared Speaker 1", event="Fish & <Chips>",
+                                 role_taker=member("Serena"))
+            session.append_event(duration=20, role_name="SAA", event="Registration", role_taker=member("A 'B' \"C\""),
+                                 show_duration=False)
+            session.append_event(duration=3, role_name="IE", event="", role_taker=member("Brenda"), gyr_cards="1 2 3")
+            agenda.append_session(session)
+            self.assertEqual(agenda.render(), agenda.render_with_bs4())
+
+    def test_meeting_agenda(self):
+        club = make_club(self)
+        library = MemberInfoLibrary(club=club)
+        meetings = ToastmasterAgendaGenerator.read_info_from_call_role(
+            "7/28 (English) Meeting\nTheme: Resilience\nTM: Fengling\nGE: Bonnie\nTimer: April\nSP1: Serena\n"
+            "SP1 Topic: Modernization of \"Small\" Farmers\nIE1: Brenda\nTTM: Sunny Wu\nTTE: Shaopeng Bu\n"
+            "Guest Speaker: Bill\nGS Topic: Q&A\nGST: 10\nNM: 2\n", 2021, club=club)
+        meetings[0].parse_info(library)
+        agenda = meetings[0].build_agenda()
+        self.assertEqual(agenda.render(), agenda.render_with_bs4())
+
+
+class GoldenAgendaTest(unittest.TestCase):
+    # golden/20210728.agenda.html is what the generator wrote for log/20210728.call_role.txt before the direct
+    # writer, the build cache and the member library rework
+    def test_logged_meeting_matches_the_baseline_agenda(self):
+        club = make_club(self)
+        tests_dir = os.path.dirname(os.path.abspath(__file__))
+        call_role_path = club.path_util.get_log_path("20210728.call_role.txt")
+        shutil.copy(os.path.join(club.path_util.package_dir, "log", "20210728.call_role.txt"), call_role_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ToastmasterAgendaGenerator(club=club).generate_agenda(call_role_path)
+        self.assertEqual(read_bytes(club.path_util.get_output_path("agenda.html")),
+                         read_bytes(os.path.join(tests_dir, "golden", "20210728.agenda.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import unittest
+from member import MemberInfoLibrary
+from tests.club_copy import make_club
+
+
+def read_bytes(file_path) -> bytes:
+    with open(file_path, "rb") as read_file:
+        content = read_file.read()
+        read_file.close()
+    return content
+
+
+def meeting_changes(library: MemberInfoLibrary):
+    library.clear_records("20210728")
+    library.assign_role("Serena", "Speaker", "20210728", "Modernization of Small Farmers")
+    library.assign_role("Brenda", "IE", "20210728", "Modernization of Small Farmers")
+    library.assign_role("Fengling", "Toastmaster", "20210728", "Resilience")
+    library.assign_role("Zorblax Newcomer", "Timer", "20210728", "Resilience")
+
+
+class MemberJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.club = make_club(self)
+        self.member_info_path = self.club.path_util.default_member_info_path
+        self.journal_path = os.path.splitext(self.member_info_path)[0] + ".journal"
+
+    def members_json(self, library: MemberInfoLibrary) -> list:
+        return [member.to_dict() for member in library.members]
+
+    def test_dump_appends_to_the_journal_only(self):
+        original = read_bytes(self.member_info_path)
+        library = MemberInfoLibrary(journal=True, club=self.club)
+        meeting_changes(library)
+        self.assertTrue(library.dump())
+        self.assertFalse(library.dump())
+        self.assertEqual(read_bytes(self.member_info_path), original)
+        self.assertTrue(os.path.exists(self.journal_path))
+
+    def test_journal_is_replayed_on_load(self):
+        library = MemberInfoLibrary(journal=True, club=self.club)
+        meeting_changes(library)
+        library.dump()
+        reloaded = MemberInfoLibrary(club=self.club)
+        self.assertEqual(self.members_json(reloaded), self.members_json(library))
+        self.assertEqual(reloaded.find("Zorblax").role_records[-1], {"Role": "Timer", "Date": "20210728"})
+
+    def test_compact_round_trip(self):
+        expected = MemberInfoLibrary(club=self.club)
+        meeting_changes(expected)
+        expected_path = os.path.join(self.club.path_util.current_dir, "data", "expected.json")
+        expected.dump(expected_path)
+
+        library = MemberInfoLibrary(journal=True, club=self.club)
+        meeting_changes(library)
+        library.dump()
+        self.assertTrue(MemberInfoLibrary(club=self.club).compact())
+        self.assertFalse(os.path.exists(self.journal_path))
+        self.assertEqual(read_bytes(self.member_info_path), read_bytes(expected_path))
+        self.assertEqual(self.members_json(MemberInfoLibrary(club=self.club)), self.members_json(library))
+
+    def test_changed_only_compact_matches_full_compact(self):
+        library = MemberInfoLibrary(journal=True, club=self.club)
+        meeting_changes(library)
+        library.dump()
+        full_path = os.path.join(self.club.path_util.current_dir, "data", "full.json")
+        MemberInfoLibrary(club=self.club).dump(full_path)
+        self.assertTrue(MemberInfoLibrary(club=self.club).compact(changed_only=True))
+        self.assertEqual(read_bytes(self.member_info_path), read_bytes(full_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
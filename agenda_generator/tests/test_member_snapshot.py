@@ -0,0 +1,299 @@
+import json
+import marshal
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+import member
+from member import LazyMemberInfoLibrary, MemberInfoLibrary
+from tests.club_copy import make_club
+from tests.test_member_journal import meeting_changes, read_bytes
+
+
+def members_json(library: MemberInfoLibrary) -> list:
+    return [member.to_dict() for member in library.members]
+
+
+class SnapshotDumpTest(unittest.TestCase):
+    def setUp(self):
+        self.club = make_club(self)
+        self.member_info_path = self.club.path_util.default_member_info_path
+        self.data_dir = os.path.dirname(self.member_info_path)
+        self.original = read_bytes(self.member_info_path)
+
+    def restore_member_info(self):
+        with open(self.member_info_path, "wb") as member_info_file:
+            member_info_file.write(self.original)
+            member_info_file.close()
+
+    def test_changed_only_dump_matches_full_dump(self):
+        for library_class in [MemberInfoLibrary, LazyMemberInfoLibrary]:
+            with self.subTest(library_class.__name__):
+                copied_path = os.path.join(self.data_dir, "copied.json")
+                library_class(club=self.club).dump(copied_path, changed_only=True)
+                self.assertEqual(read_bytes(copied_path), self.original)
+
+                library = library_class(club=self.club)
+                meeting_changes(library)
+                full_path = os.path.join(self.data_dir, "full.json")
+                library.dump(full_path)
+                library.dump(copied_path, changed_only=True)
+                self.assertEqual(read_bytes(copied_path), read_bytes(full_path))
+
+                self.assertTrue(library.compact(changed_only=True))
+                self.assertEqual(read_bytes(self.member_info_path), read_bytes(full_path))
+                self.assertEqual(members_json(library_class(club=self.club)), members_json(library))
+                self.restore_member_info()
+
+    def test_member_info_file_is_unmapped_when_replaced(self):
+        replace = os.replace
+        mapped = []
+
+        def checked_replace(source, destination):
+            if destination == self.member_info_path:
+                mapped.append(library._snapshot is not None)
+            replace(source, destination)
+
+        for library_class in [MemberInfoLibrary, LazyMemberInfoLibrary]:
+            with self.subTest(library_class.__name__):
+                library = library_class(club=self.club)
+                meeting_changes(library)
+                with mock.patch("os.replace", checked_replace):
+                    self.assertTrue(library.compact(changed_only=True))
+                self.assertEqual(mapped, [False])
+                mapped.clear()
+                self.restore_member_info()
+
+    def test_failed_replace_leaves_the_lazy_library_readable(self):
+        library = LazyMemberInfoLibrary(club=self.club)
+        meeting_changes(library)
+        with mock.patch("os.replace", side_effect=OSError("member info file in use")):
+            with self.assertRaises(OSError):
+                library.compact()
+        self.assertEqual(read_bytes(self.member_info_path), self.original)
+        self.assertEqual([name for name in os.listdir(self.data_dir) if name.endswith(".tmp")], [])
+
+        expected = MemberInfoLibrary(club=self.club)
+        meeting_changes(expected)
+        self.assertEqual(members_json(library), members_json(expected))
+        self.assertTrue(library.compact(changed_only=True))
+        self.assertEqual(members_json(LazyMemberInfoLibrary(club=self.club)), members_json(expected))
+
+
+class CountersSidecarTest(unittest.TestCase):
+    def setUp(self):
+        self.club = make_club(self)
+        self.member_info_path = self.club.path_util.default_member_info_path
+        self.counters_path = os.path.splitext(self.member_info_path)[0] + ".counters.json"
+        library = MemberInfoLibrary(club=self.club)
+        meeting_changes(library)
+        library.compact()
+        self.expected = members_json(library)
+        self.expected_counters = [member.counters for member in library.members]
+
+    def load_with_counters(self) -> MemberInfoLibrary:
+        """
+        :return: the library loaded from the member info file and the counters sidecar, not the binary snapshot
+        """
+        binary_snapshot_path = os.path.splitext(self.member_info_path)[0] + ".snapshot"
+        if os.path.exists(binary_snapshot_path):
+            os.remove(binary_snapshot_path)
+        return MemberInfoLibrary(club=self.club)
+
+    def edit_counters(self, edit):
+        with open(self.counters_path, "r", encoding="utf-8") as counters_file:
+            saved = json.load(counters_file)
+            counters_file.close()
+        edit(saved)
+        with open(self.counters_path, "w", encoding="utf-8") as counters_file:
+            json.dump(saved, counters_file)
+            counters_file.close()
+
+    def test_counters_round_trip(self):
+        saved = read_bytes(self.counters_path)
+        library = self.load_with_counters()
+        self.assertEqual(members_json(library), self.expected)
+        self.assertEqual([member.counters for member in library.members], self.expected_counters)
+        self.assertEqual(library.check_counters(), [])
+        self.assertFalse(library.compact())
+        self.assertEqual(read_bytes(self.counters_path), saved)
+
+    def test_drifted_counters_are_reported(self):
+        def add_a_role(saved):
+            saved["Members"]["Fengling Hu"]["Roles"]["Toastmaster"][0] += 1
+        self.edit_counters(add_a_role)
+        drift = self.load_with_counters().check_counters()
+        self.assertEqual(len(drift), 1)
+        self.assertRegex(drift[0], r"^Fengling Hu: Toastmaster count is \d+, records have \d+$")
+
+    def test_damaged_or_stale_counters_are_recounted(self):
+        def stale(saved):
+            saved["Snapshot Hash"] = "0" * 40
+            saved["Members"]["Fengling Hu"]["Roles"]["Toastmaster"][0] += 1
+        self.edit_counters(stale)
+        library = self.load_with_counters()
+        self.assertEqual(library.check_counters(), [])
+        self.assertEqual([member.counters for member in library.members], self.expected_counters)
+
+        with open(self.counters_path, "wb") as counters_file:
+            counters_file.write(b"{\"Snapshot Hash\": ")
+            counters_file.close()
+        library = self.load_with_counters()
+        self.assertEqual(members_json(library), self.expected)
+        self.assertEqual([member.counters for member in library.members], self.expected_counters)
+
+
+class LazyIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.club = make_club(self)
+        self.member_info_path = self.club.path_util.default_member_info_path
+        self.index_path = os.path.splitext(self.member_info_path)[0] + ".index.json"
+
+    def load_from_index(self) -> LazyMemberInfoLibrary:
+        """
+        :return: the lazy library, failing the test if it has to rebuild the index
+        """
+        with mock.patch.object(LazyMemberInfoLibrary, "_build_index", side_effect=AssertionError("index rebuilt")):
+            return LazyMemberInfoLibrary(club=self.club)
+
+    def rebuilt_index(self) -> bytes:
+        os.remove(self.index_path)
+        LazyMemberInfoLibrary(club=self.club)
+        return read_bytes(self.index_path)
+
+    def test_index_round_trip(self):
+        LazyMemberInfoLibrary(club=self.club)
+        self.assertEqual(members_json(self.load_from_index()), members_json(MemberInfoLibrary(club=self.club)))
+
+        library = self.load_from_index()
+        meeting_changes(library)
+        self.assertTrue(library.compact())
+        saved = read_bytes(self.index_path)
+        reloaded = self.load_from_index()
+        self.assertEqual(reloaded.find("Zorblax").role_records[-1], {"Role": "Timer", "Date": "20210728"})
+        self.assertEqual(members_json(reloaded), members_json(library))
+        self.assertEqual(self.rebuilt_index(), saved)
+
+    def test_stale_or_damaged_index_is_rebuilt(self):
+        LazyMemberInfoLibrary(club=self.club)
+        saved = read_bytes(self.index_path)
+        expected = members_json(MemberInfoLibrary(club=self.club))
+        stat = os.stat(self.member_info_path)
+        os.utime(self.member_info_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        with mock.patch.object(LazyMemberInfoLibrary, "_build_index", autospec=True,
+                               side_effect=LazyMemberInfoLibrary._build_index) as build_index:
+            self.assertEqual(members_json(LazyMemberInfoLibrary(club=self.club)), expected)
+            self.assertEqual(build_index.call_count, 1)
+        self.assertEqual(members_json(self.load_from_index()), expected)
+
+        with open(self.index_path, "wb") as index_file:
+            index_file.write(saved[:len(saved) // 2])
+            index_file.close()
+        self.assertEqual(members_json(LazyMemberInfoLibrary(club=self.club)), expected)
+        self.assertEqual(members_json(self.load_from_index()), expected)
+
+
+# writes the binary snapshot of the club given in argv[2] from a process whose code tables hold the names given in
+# argv[1] in reverse order, so its codes differ from those of the test process
+WRITE_SNAPSHOT_WITH_OTHER_CODES = """
+import json, sys
+import member
+from club_context import ClubContext
+for table, names in zip([member._roles, member._levels, member._speech_types], json.loads(sys.argv[1])):
+    for name in reversed(names):
+        table.code(name)
+member.MemberInfoLibrary(club=ClubContext(sys.argv[2]))
+"""
+
+
+class BinarySnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.club = make_club(self)
+        self.member_info_path = self.club.path_util.default_member_info_path
+        self.binary_snapshot_path = os.path.splitext(self.member_info_path)[0] + ".snapshot"
+        self.data_dir = os.path.dirname(self.member_info_path)
+
+    def load_from_snapshot(self) -> MemberInfoLibrary:
+        """
+        :return: the library, failing the test if it parses the member info file instead of the binary snapshot
+        """
+        with mock.patch.object(MemberInfoLibrary, "_add_member", side_effect=AssertionError("member info parsed")):
+            return MemberInfoLibrary(club=self.club)
+
+    def load_from_json(self) -> MemberInfoLibrary:
+        if os.path.exists(self.binary_snapshot_path):
+            os.remove(self.binary_snapshot_path)
+        return MemberInfoLibrary(club=self.club)
+
+    def test_snapshot_round_trip(self):
+        expected = self.load_from_json()
+        saved = read_bytes(self.binary_snapshot_path)
+        self.assertEqual(members_json(self.load_from_snapshot()), members_json(expected))
+
+        library = self.load_from_snapshot()
+        meeting_changes(library)
+        self.assertTrue(library.compact())
+        reloaded = self.load_from_snapshot()
+        self.assertEqual(members_json(reloaded), members_json(library))
+        self.assertEqual([member_info.counters for member_info in reloaded.members],
+                         [member_info.counters for member_info in library.members])
+        self.assertEqual(reloaded.members_on("20210728"), [reloaded.find(name) for name in [
+            member_info.english_name for member_info in library.members_on("20210728")]])
+        self.load_from_json()
+        self.assertNotEqual(read_bytes(self.binary_snapshot_path), saved)
+        self.assertEqual(members_json(self.load_from_snapshot()), members_json(library))
+
+    def test_snapshot_of_another_process_is_remapped(self):
+        expected = members_json(self.load_from_json())
+        os.remove(self.binary_snapshot_path)
+        subprocess.run([sys.executable, "-c", WRITE_SNAPSHOT_WITH_OTHER_CODES,
+                        json.dumps(member.snapshot_code_tables()), self.club.path_util.current_dir],
+                       cwd=os.path.dirname(member.__file__), check=True)
+        with open(self.binary_snapshot_path, "rb") as snapshot_file:
+            code_tables = marshal.loads(snapshot_file.read())["Code Tables"]
+            snapshot_file.close()
+        self.assertNotEqual(member.snapshot_code_maps(code_tables), (None, None, None))
+        library = self.load_from_snapshot()
+        self.assertEqual(members_json(library), expected)
+        self.assertEqual(library.check_counters(), [])
+
+    def test_changed_member_info_file_is_parsed_again(self):
+        self.load_from_json()
+        stat = os.stat(self.member_info_path)
+        os.utime(self.member_info_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        # same bytes, found by hash
+        self.load_from_snapshot()
+
+        content = read_bytes(self.member_info_path)
+        self.assertIn(b'"20191127"', content)
+        with open(self.member_info_path, "wb") as member_info_file:
+            member_info_file.write(content.replace(b'"20191127"', b'"20191128"'))
+            member_info_file.close()
+        os.utime(self.member_info_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2000000000))
+        library = MemberInfoLibrary(club=self.club)
+        self.assertIn("20191128", [record["Date"] for record in library.find("Serena").role_records])
+        self.assertEqual(members_json(self.load_from_snapshot()), members_json(library))
+
+    def test_damaged_snapshot_is_ignored(self):
+        expected = members_json(self.load_from_json())
+        saved = read_bytes(self.binary_snapshot_path)
+        for damaged in [saved[:len(saved) // 2], b"not a snapshot"]:
+            with open(self.binary_snapshot_path, "wb") as snapshot_file:
+                snapshot_file.write(damaged)
+                snapshot_file.close()
+            self.assertEqual(members_json(MemberInfoLibrary(club=self.club)), expected)
+            self.assertEqual(read_bytes(self.binary_snapshot_path), saved)
+
+    def test_failed_snapshot_write_is_skipped(self):
+        expected = members_json(self.load_from_json())
+        os.remove(self.binary_snapshot_path)
+        for failure in ["tempfile.mkstemp", "os.replace"]:
+            with mock.patch(failure, side_effect=OSError("read-only data directory")):
+                self.assertEqual(members_json(MemberInfoLibrary(club=self.club)), expected)
+            self.assertFalse(os.path.exists(self.binary_snapshot_path))
+            self.assertEqual([name for name in os.listdir(self.data_dir) if name.endswith(".tmp")], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
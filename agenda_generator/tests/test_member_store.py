@@ -0,0 +1,69 @@
+import json
+import os
+import unittest
+from member import MemberInfoLibrary
+from member_store import SqliteMemberLibrary, open_member_library
+from tests.club_copy import make_club
+from tests.test_member_journal import meeting_changes
+
+
+class SqliteMemberLibraryTest(unittest.TestCase):
+    def setUp(self):
+        self.club = make_club(self)
+        self.member_info_path = self.club.path_util.default_member_info_path
+        self.database_path = os.path.join(self.club.path_util.current_dir, "data", "members.sqlite")
+        library = SqliteMemberLibrary(self.database_path, club=self.club)
+        library.import_json(self.member_info_path)
+        library.close()
+
+    def open(self) -> SqliteMemberLibrary:
+        """
+        :return: the library, closed when the test ends unless the test closes it itself
+        """
+        library = open_member_library(self.database_path, club=self.club)
+        self.addCleanup(lambda: library._connection.close())
+        return library
+
+    def load_json(self, file_path) -> list:
+        with open(file_path, "r", encoding="utf-8") as json_file:
+            content = json.load(json_file)
+            json_file.close()
+        return content
+
+    def test_import_export_round_trip(self):
+        export_path = os.path.join(self.club.path_util.current_dir, "data", "export.json")
+        self.assertTrue(self.open().export_json(export_path))
+        self.assertEqual(self.load_json(export_path), self.load_json(self.member_info_path))
+
+    def test_changes_match_the_json_library_after_reopen(self):
+        expected = MemberInfoLibrary(club=self.club)
+        meeting_changes(expected)
+        library = self.open()
+        meeting_changes(library)
+        self.assertTrue(library.dump())
+        self.assertFalse(library.dump())
+        library.close()
+        self.assertEqual(
+            [member.to_dict() for member in self.open().members],
+            [member.to_dict() for member in expected.members]
+        )
+
+    def test_members_between(self):
+        expected = MemberInfoLibrary(club=self.club)
+        library = self.open()
+        for first, end in [("20210101", None), ("20210101", "20210301"), ("20990101", None)]:
+            self.assertEqual(
+                [member.english_name for member in library.members_between(first, end)],
+                [member.english_name for member in expected.members_between(first, end)]
+            )
+
+    def test_mentors_are_kept(self):
+        library = self.open()
+        library.find("Serena").set_mentor("Bonnie", library)
+        self.assertTrue(library.dump())
+        library.close()
+        self.assertEqual(self.open().find("Serena").mentor.english_name, "Bonnie Wang")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import unittest
+from call_role import CallRoleError
+from member import MemberInfoLibrary, UnknownMemberError, min_distance
+from name_index import NameFuzzyIndex, NamePrefixIndex, bounded_distance
+from toastmaster_generator import ToastmasterAgendaGenerator
+from tests.club_copy import make_club
+
+
+class NamePrefixIndexTest(unittest.TestCase):
+    def test_first_match_is_smallest_position(self):
+        index = NamePrefixIndex()
+        index.add("Bonnie Wang", 3)
+        index.add("Bob", 5)
+        index.add("bonnie", 1)
+        self.assertEqual(index.first_match("BON"), 1)
+        self.assertEqual(index.first_match("bo"), 1)
+        self.assertEqual(index.first_match("Bob"), 5)
+        self.assertIsNone(index.first_match("Bonnie W."))
+
+    def test_bounded_distance_matches_min_distance(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            word1 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))
+            word2 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))
+            limit = rng.randint(0, 3)
+            expected = min_distance(word1, word2)
+            self.assertEqual(bounded_distance(word1, word2, limit), expected if expected <= limit else limit + 1)
+
+    def test_fuzzy_search_finds_typos_closest_first(self):
+        index = NameFuzzyIndex()
+        for position, name in enumerate(["Raymond Lu", "Raymond", "Brenda Wang"]):
+            index.add(name, position)
+        self.assertEqual(index.search("Raymnd"), [(1, 0), (1, 1)])
+        self.assertEqual(index.search("brenda wnag"), [(2, 2)])
+        self.assertEqual(index.search("zzzz"), [])
+
+
+class LibraryNameResolutionTest(unittest.TestCase):
+    def setUp(self):
+        self.club = make_club(self)
+
+    def test_find_resolves_prefixes_case_insensitively(self):
+        library = MemberInfoLibrary(club=self.club)
+        self.assertEqual(library.find("bonnie").english_name, "Bonnie Wang")
+        self.assertEqual(library.find("宝妮").english_name, "Bonnie Wang")
+        self.assertEqual(library.find("Walter").english_name, "Shuhan")
+
+    def test_near_misses_fail_with_suggestions(self):
+        library = MemberInfoLibrary(club=self.club)
+        member_count = len(library.members)
+        self.assertEqual(library.suggest("Bonie Wang")[0][0].english_name, "Bonnie Wang")
+        self.assertIsNone(library.resolve("Bonie Wang"))
+        with self.assertRaises(UnknownMemberError) as raised:
+            library.find("Bonie Wang")
+        self.assertEqual(raised.exception.suggestions[0], "Bonnie Wang")
+        self.assertEqual(len(library.members), member_count)
+        # nobody comes close, so a new member is added
+        self.assertEqual(library.find("Zorblax Newcomer").english_name, "Zorblax Newcomer")
+        self.assertEqual(len(library.members), member_count + 1)
+
+    def test_near_misses_in_a_call_role_are_reported_at_the_meeting(self):
+        call_role_text = "7/21 (English) Meeting\nTM: Fengling\n\n7/28 (English) Meeting\nTM: Bonie Wang\n"
+        for confidence, taker in [(None, None), (0.8, "Bonnie Wang")]:
+            with self.subTest(confidence=confidence):
+                library = MemberInfoLibrary(club=self.club, auto_resolve_confidence=confidence)
+                meeting = ToastmasterAgendaGenerator.read_info_from_call_role(
+                    call_role_text, 2021, "meeting.txt", self.club)[1]
+                if taker is None:
+                    with self.assertRaisesRegex(CallRoleError, r'^meeting\.txt:4: unknown member "Bonie Wang", '
+                                                               r'did you mean "Bonnie Wang"'):
+                        meeting.parse_info(library)
+                else:
+                    meeting.parse_info(library)
+                    self.assertIn(taker, [member.english_name for member in library.members_on("20210728")])
+
+    def test_confident_near_misses_auto_resolve(self):
+        library = MemberInfoLibrary(club=self.club, auto_resolve_confidence=0.8)
+        member_count = len(library.members)
+        self.assertEqual(library.resolve("Bonie Wang").english_name, "Bonnie Wang")
+        self.assertEqual(library.find("Bonie Wang").english_name, "Bonnie Wang")
+        self.assertEqual(len(library.members), member_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+from unittest import mock
+from server import AgendaService
+from toastmaster_generator import Meeting
+from tests.club_copy import make_club
+from tests.test_build_cache import TWO_MEETINGS
+
+
+class AgendaServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.club = make_club(self)
+        self.first_meeting, self.second_meeting = TWO_MEETINGS.split("\n\n")
+
+    def test_failed_request_keeps_the_earlier_records_without_persist(self):
+        service = AgendaService(persist=False, club=self.club)
+        service.generate(self.first_meeting, 2021)
+        build_agenda = Meeting.build_agenda
+
+        def failing_build_agenda(meeting):
+            if meeting.date_str == "20210811":
+                raise RuntimeError("render failed")
+            return build_agenda(meeting)
+
+        with mock.patch.object(Meeting, "build_agenda", failing_build_agenda):
+            with self.assertRaises(RuntimeError):
+                service.generate(self.second_meeting, 2021)
+        library = service._member_info_lib
+        self.assertNotEqual(library.members_on("20210804"), [])
+        self.assertEqual(library.members_on("20210811"), [])
@@ -0,0 +1,97 @@
+import contextlib
+import io
+import os
+import unittest
+from toastmaster_generator import ToastmasterAgendaGenerator
+from watcher import AgendaWatcher
+from tests.club_copy import make_club
+from tests.test_build_cache import TWO_MEETINGS
+
+
+def read_text(file_path) -> str:
+    with open(file_path, "r", encoding="utf-8") as read_file:
+        content = read_file.read()
+        read_file.close()
+    return content
+
+
+def write_text(file_path, text):
+    stat = os.stat(file_path) if os.path.exists(file_path) else None
+    with open(file_path, "w", encoding="utf-8") as write_file:
+        write_file.write(text)
+        write_file.close()
+    if stat is not None:
+        # polls compare modification times, make sure quick edits move them
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+
+class AgendaWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.club = make_club(self)
+        self.call_role_path = os.path.join(self.club.path_util.current_dir, "data", "2021.call_role.txt")
+        write_text(self.call_role_path, TWO_MEETINGS)
+        self.watcher = AgendaWatcher(ToastmasterAgendaGenerator(club=self.club), self.call_role_path)
+
+    def poll(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [os.path.basename(file_path) for file_path in self.watcher.poll()]
+
+    def agendas(self, club) -> dict:
+        return {
+            date_str: read_text(club.path_util.get_output_path("{}.agenda.html".format(date_str)))
+            for date_str in ["20210804", "20210811"]
+        }
+
+    def assert_same_as_generator(self, call_role_text):
+        club = make_club(self)
+        call_role_path = os.path.join(club.path_util.current_dir, "data", "2021.call_role.txt")
+        write_text(call_role_path, call_role_text)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ToastmasterAgendaGenerator(club=club).generate_agenda(call_role_path, jobs=1)
+        self.assertEqual(self.agendas(self.club), self.agendas(club))
+        self.assertEqual(read_text(self.club.path_util.get_output_path("agenda.html")),
+                         read_text(club.path_util.get_output_path("agenda.html")))
+
+    def test_each_agenda_shows_its_own_meeting(self):
+        self.assertEqual(self.poll(), ["20210804.agenda.html", "20210811.agenda.html", "agenda.html"])
+        agendas = self.agendas(self.club)
+        self.assertIn("Modernization of Small Farmers", agendas["20210804"])
+        self.assertNotIn("Second speech", agendas["20210804"])
+        self.assertIn("Second speech", agendas["20210811"])
+        self.assert_same_as_generator(TWO_MEETINGS)
+
+    def test_edits_render_only_what_changed(self):
+        self.poll()
+        self.assertEqual(self.poll(), [])
+        edited = TWO_MEETINGS.replace("Theme: Growth", "Theme: Change")
+        write_text(self.call_role_path, edited)
+        self.assertEqual(self.poll(), ["20210811.agenda.html", "agenda.html"])
+        self.assert_same_as_generator(edited)
+
+        # Serena's 8/11 speech level follows from who spoke on 8/4, so both meetings are parsed again
+        edited = edited.replace("SP1: Serena\nSP1 Topic: Modernization", "SP1: Lewis\nSP1 Topic: Modernization")
+        write_text(self.call_role_path, edited)
+        self.assertIn("20210804.agenda.html", self.poll())
+        self.assert_same_as_generator(edited)
+
+    def test_failed_polls_are_retried(self):
+        self.poll()
+        write_text(self.call_role_path, TWO_MEETINGS.replace("8/11", "13/45"))
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.poll()
+        edited = TWO_MEETINGS.replace("Theme: Growth", "Theme: Change")
+        write_text(self.call_role_path, edited)
+        self.assertEqual(self.poll(), ["20210811.agenda.html", "agenda.html"])
+        self.assert_same_as_generator(edited)
+
+    def test_member_journal_is_watched(self):
+        self.poll()
+        journal_path = os.path.splitext(self.club.path_util.default_member_info_path)[0] + ".journal"
+        write_text(journal_path, '{"Event": "Role", "English Name": "Serena", "Role": "Timer", "Date": "20210728", "Topic": ""}\n')
+        self.poll()
+        self.assertIn("20210728", [record["Date"] for record in self.watcher._member_lib.find("Serena").role_records])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,29 @@
+import io
 import json
-import openpyxl
 import re
 import datetime
 import sys
+import argparse
 from os import path
 import subprocess
 import os
-from typing import Dict, Optional, List
-from member import MemberInfo, MemberInfoLibrary
-from path_util import PathUtil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, Iterable, Iterator, Optional, List, Tuple
+from member import MemberInfo, MemberInfoLibrary, UnknownMemberError
+from member_store import open_member_library
+from call_role import CallRoleError, MeetingRecord, parse_call_role, strip_name
+from club_context import ClubContext
+from path_util import CONFIG_NAMES, PathUtil
 from agenda import Agenda, Session
+from recommender import recommend_main
+from watcher import AgendaWatcher
+import profiler
+from build_cache import BuildCache, copy_if_changed, digest_of, write_if_changed
+
+
+# modules whose code shapes the agenda, so a change to them invalidates the build cache
+AGENDA_MODULES = ["agenda.py", "html_writer.py", "member.py", "toastmaster_generator.py"]
 
 
 def try_get_str(s):
@@ -17,7 +31,14 @@ def try_get_str(s):
 
 
 class Meeting:
-    def __init__(self, month: int, day: int, is_english: bool, year=None):
+    def __init__(self, month: int, day: int, is_english: bool, year=None, club=None):
+        """
+        :param club: the club whose configs and template the meeting uses, the package directory by default
+        """
+        self._club = ClubContext.default() if club is None else club
+        # where the meeting header is, for errors about its role takers
+        self._source_name = "<call role>"
+        self._line_number = 0
         self._function_role_taker = {}  # type: Dict[str, MemberInfo]
         self._info = {}  # type: Dict[str, str]
         self._year = year if year is not None else datetime.datetime.now().year
@@ -30,13 +51,28 @@ class Meeting:
         self._skip_dict = set() # special hacks to skip events
         self._special_events = {} # hacks to get special events
 
-        with open(PathUtil().get_config_path("time_dict"), "r", encoding="utf-8") as time_dict_file:
-            self._time_dict = json.load(time_dict_file)
-            time_dict_file.close()
+        self._time_dict = self._club.config.get("time_dict")
+        self._roles = self._club.config.get("roles")
 
-        with open(PathUtil().get_config_path("roles"), "r", encoding="utf-8") as roles_file:
-            self._roles = json.load(roles_file)
-            roles_file.close()
+    @classmethod
+    def from_record(cls, record: MeetingRecord, year=None, club=None, source_name="<call role>"):
+        meeting = cls(
+            month=record.month,
+            day=record.day,
+            year=year,
+            is_english=True,  # (m.group(3) == "English")
+            club=club
+        )
+        try:
+            datetime.date(meeting._year, meeting._month, meeting._day)
+        except ValueError as e:
+            raise CallRoleError(source_name, record.line_number, "invalid meeting date {}/{}: {}".format(
+                record.month, record.day, e)) from None
+        meeting._info.update(record.info)
+        meeting._skip_dict.update(record.skipped_events)
+        meeting._source_name = source_name
+        meeting._line_number = record.line_number
+        return meeting
 
     @property
     def date_str(self) -> str:
@@ -85,51 +121,100 @@ class Meeting:
         return len(self._speakers)
 
     def parse_info(self, member_lib: MemberInfoLibrary):
-        self._speakers.clear()
+        """
+        :raise CallRoleError: if a role taker's name is close to members but resolves to none of them
+        """
         try:
-            self._new_member_count = int(self.try_get_info("NM"))
-        except:
-            self._new_member_count = -1
-
-        self._theme = self.try_get_info("Theme")
-
+            self._parse_info(member_lib)
+        except UnknownMemberError as e:
+            raise CallRoleError(self._source_name, self._line_number, str(e)) from None
+
+    def _parse_info(self, member_lib: MemberInfoLibrary):
+        with profiler.span("Meeting.parse_info", {"date": self.date_str}):
+            self._speakers.clear()
+            try:
+                self._new_member_count = int(self.try_get_info("NM"))
+            except:
+                self._new_member_count = -1
+
+            self._theme = self.try_get_info("Theme")
+
+            with profiler.span("assign speakers"):
+                for i in range(1, 5):
+                    speaker_name = self.try_get_info("SP{}".format(i))
+                    speech_topic = self.try_get_info("SP{} Topic".format(i))
+                    if len(speaker_name) is not 0:
+                        role_taker = member_lib.assign_role(
+                            speaker_name,
+                            "Speaker".format(i),
+                            self.date_str,
+                            topic=speech_topic
+                        )
+
+                        self._speakers.append(role_taker)
+                    evaluator_name = self.try_get_info("IE{}".format(i))
+                    self._function_role_taker["IE{}".format(i)] = member_lib.assign_role(
+                        evaluator_name, "IE", self.date_str, topic=speech_topic)
+
+            with profiler.span("assign function roles"):
+                for role in self._roles:
+                    role_taker_name = self.try_get_info(role["name"])
+                    if len(role_taker_name) is 0 and "nick" in role:
+                        role_taker_name = self.try_get_info(role["nick"])
+                    if len(role_taker_name) is 0 and "default_taker" in role:
+                        role_taker_name = role["default_taker"]
+
+                    self._function_role_taker[role["name"]] = member_lib.assign_role(
+                        role_taker_name,
+                        role["name"],
+                        self.date_str,
+                        self._theme
+                    )
+
+            # special events
+            for se_type in ["SE_SP", "SE_TE"]:
+                special_event = {}
+                for attribute in ["role", "role taker", "topic", "duration", "gyr"]:
+                    special_event[attribute] = self.try_get_info("%s %s" % (se_type, attribute))
+                if special_event["topic"]:
+                    self._special_events[se_type] = special_event
+
+    def referenced_names(self) -> List[str]:
+        """
+        :return: the role taker names parse_info looks up, in the same order
+        """
+        names = []
         for i in range(1, 5):
-            speaker_name = self.try_get_info("SP{}".format(i))
-            speech_topic = self.try_get_info("SP{} Topic".format(i))
-            if len(speaker_name) is not 0:
-                role_taker = member_lib.assign_role(
-                    speaker_name,
-                    "Speaker".format(i),
-                    self.date_str,
-                    topic=speech_topic
-                )
-
-                self._speakers.append(role_taker)
-            evaluator_name = self.try_get_info("IE{}".format(i))
-            self._function_role_taker["IE{}".format(i)] = member_lib.assign_role(
-                evaluator_name, "IE", self.date_str, topic=speech_topic)
-
+            names.append(self.try_get_info("SP{}".format(i)))
+            names.append(self.try_get_info("IE{}".format(i)))
         for role in self._roles:
             role_taker_name = self.try_get_info(role["name"])
-            if len(role_taker_name) is 0 and "nick" in role:
+            if len(role_taker_name) == 0 and "nick" in role:
                 role_taker_name = self.try_get_info(role["nick"])
-            if len(role_taker_name) is 0 and "default_taker" in role:
+            if len(role_taker_name) == 0 and "default_taker" in role:
                 role_taker_name = role["default_taker"]
-
-            self._function_role_taker[role["name"]] = member_lib.assign_role(
-                role_taker_name,
-                role["name"],
-                self.date_str,
-                self._theme
-            )
-
-        # special events
-        for se_type in ["SE_SP", "SE_TE"]:
-            special_event = {}
-            for attribute in ["role", "role taker", "topic", "duration", "gyr"]:
-                special_event[attribute] = self.try_get_info("%s %s" % (se_type, attribute))
-            if special_event["topic"]:
-                self._special_events[se_type] = special_event
+            names.append(role_taker_name)
+        return [name for name in names if len(name) != 0]
+
+    def input_parts(self) -> list:
+        return [self.date_str, self._is_english, sorted(self._info.items()), sorted(self._skip_dict)]
+
+    def earlier_records(self, member_lib: MemberInfoLibrary) -> list:
+        """
+        :return: for each referenced name, the member parse_info would assign, with the records dated before the
+            meeting, which decide speech levels and are shown on the agenda; a name parse_info would add as a new
+            member is given as that member, so the result is the same once it has been added
+        """
+        records = []
+        for name in self.referenced_names():
+            member = member_lib.resolve(name)
+            if member is None:
+                records.append([name, name, []])
+                continue
+            records.append([name, member.english_name, [
+                record for record in member.role_records + member.speech_records if record["Date"] < self.date_str
+            ]])
+        return records
 
     def role_taken(self, role_name) -> bool:
         if role_name in self._function_role_taker:
@@ -432,8 +517,18 @@ class Meeting:
     def real_ge(self) -> str:
         return "GE" if self.role_taken("GE") else "Toastmaster"
 
-    def to_agenda(self, output_path):
-        agenda = Agenda(self.language, self._theme, len(self._speakers))
+    def to_agenda(self, output_path) -> bool:
+        with profiler.span("Meeting.to_agenda", {"date": self.date_str}):
+            with profiler.span("Meeting.build_agenda"):
+                agenda = self.build_agenda()
+            return agenda.dump(output_path)
+
+    def build_agenda(self) -> Agenda:
+        """
+        Lay out the agenda from the current role takers. The result only holds rendered strings, so it stays valid
+        after later meetings change the member records and can be rendered in another process.
+        """
+        agenda = Agenda(self.language, self._theme, len(self._speakers), self._club)
 
         # opening
         agenda.append_session(self.opening_session(datetime.datetime(self._year, self._month, self._day, 18, 45)))
@@ -446,121 +541,320 @@ class Meeting:
         agenda.append_session(self.table_topic_session(agenda.current_datetime))
 
         agenda.append_session(self.evaluation_session(agenda.current_datetime))
-        agenda.dump(output_path)
+        return agenda
+
+
+def records_between(member_lib: MemberInfoLibrary, first_date_str, end_date_str=None) -> list:
+    return [
+        [member.english_name, [
+            record for record in member.role_records + member.speech_records
+            if first_date_str <= record["Date"] and (end_date_str is None or record["Date"] < end_date_str)
+        ]]
+        for member in member_lib.members_between(first_date_str, end_date_str)
+    ]
+
+
+def dump_agenda(agenda: Agenda, output_path) -> bool:
+    return agenda.dump(output_path)
 
 
 class ToastmasterAgendaGenerator:
-    def __init__(self, current_year=None):
+    def __init__(self, current_year=None, club=None):
+        """
+        :param club: the club to generate agendas for, the package directory by default
+        """
         # from path_util import PathUtil
         # with open(PathUtil().get_config_path("time_dict"), "r", encoding="utf-8") as time_dict_file:
         #     self.time_dict = json.load(time_dict_file)
         #     time_dict_file.close()
         self._current_year = current_year
+        self.club = ClubContext.default() if club is None else club
 
     @property
-    def path_util(self):
-        return PathUtil()
+    def path_util(self) -> PathUtil:
+        return self.club.path_util
 
     @classmethod
     def strip_name(cls, member_name: str):
-        return re.sub(r"[\ud83c\ufe0f\udf3f\u5973\u795e\u7537\ud83d\udf38\udf3b]|(\[.*])|(N/A)", "", member_name).strip()
+        return strip_name(member_name)
 
     @classmethod
-    def read_info_from_call_role(cls, call_role_text, year=None):
-        meetings = []
-        meeting_info = None  # type: Optional[Meeting]
-        for line in call_role_text.split('\n'):
-            line = line.replace("：", ":")
-            m = re.match(r"^([0-9]+)/([0-9]+)", line)
-            if m is not None:
-                if meeting_info is not None:
-                    meetings.append(meeting_info)
-                meeting_info = Meeting(
-                    month=int(m.group(1)),
-                    day=int(m.group(2)),
-                    year=year,
-                    is_english=True # (m.group(3) == "English")
-                )
-            elif line.find(":") is not -1:
-                ti = line.find(":")
-                if line[:ti].strip().lower() == "skip":
-                    meeting_info._skip_dict.add(cls.strip_name(line[ti+1:]).lower())
-                else:
-                    meeting_info.set_info(line[:ti].strip(), cls.strip_name(line[ti+1:]))
+    def iter_meetings(cls, call_role_lines: Iterable[str], year=None, source_name="<call role>",
+                      club=None) -> Iterator[Meeting]:
+        for record in parse_call_role(call_role_lines, source_name):
+            yield Meeting.from_record(record, year, club, source_name)
 
-        if meeting_info is not None:
-            meetings.append(meeting_info)
-        return meetings
+    @classmethod
+    def call_role_year(cls, call_role_path) -> Optional[int]:
+        """
+        :return: the year a logged call role file name starts with, or None for the current year
+        """
+        year_str = path.split(call_role_path)[-1][:4]
+        try:
+            return int(year_str)
+        except:
+            return None
 
-    def generate_agenda(self, call_role_path=None, member_info_path=None, update_member_info=False, log_agenda=False):
+    @classmethod
+    def read_info_from_call_role(cls, call_role_text, year=None, source_name="<call role>", club=None):
+        return list(cls.iter_meetings(io.StringIO(call_role_text), year, source_name, club))
+
+    def generate_agenda(self, call_role_path=None, member_info_path=None, update_member_info=False, log_agenda=False,
+                        jobs=None, auto_resolve_confidence=None) -> bool:
+        """
+        :param jobs: worker processes rendering the agendas when the call role text holds several meetings; by default
+            they are rendered in this process, as handing an agenda to a worker costs about as much as rendering it;
+            each is written to output/{date}.agenda.html and output/agenda.html gets the last one
+        :param auto_resolve_confidence: see MemberInfoLibrary
+        :return: whether any file changed; meetings whose inputs, member records and outputs all match the build cache
+            are skipped, and files are only rewritten when their bytes change
+        """
         if call_role_path is None:
             call_role_path = self.path_util.default_meeting_info_path
-        member_info_lib = MemberInfoLibrary(member_info_path)
-        with open(call_role_path, "r", encoding="utf-8") as call_role_file:
+        member_info_lib = open_member_library(member_info_path, lazy=True, journal=update_member_info, club=self.club,
+                                              auto_resolve_confidence=auto_resolve_confidence)
+        build_cache = BuildCache(self.path_util.get_output_path("build_cache.json"), self.path_util.current_dir)
+        inputs_digest = BuildCache.files_digest(
+            [self.path_util.get_config_path(name) for name in CONFIG_NAMES] +
+            [self.path_util.get_template("default.html")] +
+            [path.join(self.path_util.package_dir, module) for module in AGENDA_MODULES]
+        )
+        changed = False
+        with profiler.span("read call role"), open(call_role_path, "r", encoding="utf-8") as call_role_file:
             origin_text = call_role_file.read()
             call_role_file.close()
 
-        year_str = path.split(call_role_path)[-1][:4]
-        try:
-            year = int(year_str)
-        except:
-            year = None
-
-        for next_meeting in self.read_info_from_call_role(origin_text, year):
-            # log
-            with open(
-                self.path_util.get_log_path("{0}.call_role.txt".format(next_meeting.date_str)),
-                "w",
-                encoding="utf-8"
-            ) as meeting_log_file:
-                meeting_log_file.write(origin_text)
-                meeting_log_file.close()
-
-            member_info_lib.clear_records(next_meeting.date_str)
-            next_meeting.parse_info(member_info_lib)
-            print(str(next_meeting))
-
-            agenda_path = self.path_util.get_output_path("agenda.html")
-            next_meeting.to_agenda(agenda_path)
-            import shutil
-            agenda_backup_path = self.path_util.get_log_path("{0}.agenda.html".format(next_meeting.date_str))
-            if log_agenda is True:
-                shutil.copy2(agenda_path, agenda_backup_path)
-
-            if update_member_info is False:
-                member_info_lib.dump(self.path_util.get_output_path(
-                    "{0}.member_info.json".format(next_meeting.date_str)))
+        year = self.call_role_year(call_role_path)
+
+        with profiler.span("parse call role"):
+            meetings = self.read_info_from_call_role(origin_text, year, call_role_path, self.club)
+        # each meeting of a multi-meeting text gets its own agenda, so each has outputs of its own in the build cache
+        per_date = len(meetings) > 1
+        # roles are assigned in date order here, only the rendering of the resulting agendas runs in parallel
+        parallel = per_date and jobs is not None and jobs > 1
+        rendered = []  # type: List[Tuple[str, str, object, List[str], Tuple[str, str, str]]]
+        with ExitStack() as executor_stack:
+            # started for the first meeting to render, so fully cached runs start no workers
+            executor = None
+            for i, next_meeting in enumerate(meetings):
+                # the records this meeting leaves in the library, later meetings only clear from their own date on
+                end_date_str = meetings[i + 1].date_str if i + 1 < len(meetings) else None
+                log_path = self.path_util.get_log_path("{0}.call_role.txt".format(next_meeting.date_str))
+                agenda_backup_path = self.path_util.get_log_path("{0}.agenda.html".format(next_meeting.date_str))
+                if not per_date:
+                    agenda_path = self.path_util.get_output_path("agenda.html")
+                else:
+                    agenda_path = self.path_util.get_output_path("{0}.agenda.html".format(next_meeting.date_str))
+                output_paths = [log_path, agenda_path]
+                if log_agenda is True:
+                    output_paths.append(agenda_backup_path)
+                if update_member_info is False:
+                    member_info_backup_path = self.path_util.get_output_path(
+                        "{0}.member_info.json".format(next_meeting.date_str))
+                    output_paths.append(member_info_backup_path)
+
+                with profiler.span("fingerprint meeting"):
+                    fingerprint = digest_of([
+                        inputs_digest,
+                        origin_text,
+                        next_meeting.input_parts(),
+                        next_meeting.earlier_records(member_info_lib)
+                    ])
+                    state = digest_of(records_between(member_info_lib, next_meeting.date_str, end_date_str))
+                if build_cache.is_fresh(next_meeting.date_str, fingerprint, state):
+                    print("{}: inputs unchanged, skipped".format(next_meeting.date_str))
+                    continue
+
+                # log
+                with profiler.span("write call role log"):
+                    changed |= write_if_changed(log_path, origin_text.encode("utf-8"))
+
+                with profiler.span("clear_records"):
+                    member_info_lib.clear_records(next_meeting.date_str)
+                next_meeting.parse_info(member_info_lib)
+                print(str(next_meeting))
+                cache_entry = (next_meeting.date_str, fingerprint, digest_of(
+                    records_between(member_info_lib, next_meeting.date_str, end_date_str)))
+
+                if not parallel:
+                    changed |= next_meeting.to_agenda(agenda_path)
+                    if log_agenda is True:
+                        changed |= copy_if_changed(agenda_path, agenda_backup_path)
+                else:
+                    with profiler.span("Meeting.build_agenda"):
+                        agenda = next_meeting.build_agenda()
+                    if executor is None:
+                        executor = executor_stack.enter_context(ProcessPoolExecutor(jobs))
+                    future = executor.submit(dump_agenda, agenda, agenda_path)
+                    rendered.append((agenda_path, agenda_backup_path, future, output_paths, cache_entry))
+
+                if update_member_info is False:
+                    changed |= member_info_lib.dump(member_info_backup_path)
+                if not parallel:
+                    build_cache.record(*cache_entry, output_paths)
+
+            for agenda_path, agenda_backup_path, future, output_paths, cache_entry in rendered:
+                with profiler.span("wait for agenda worker"):
+                    changed |= future.result()
+                if log_agenda is True:
+                    changed |= copy_if_changed(agenda_path, agenda_backup_path)
+                build_cache.record(*cache_entry, output_paths)
+        if per_date:
+            last_agenda_path = self.path_util.get_output_path("{0}.agenda.html".format(meetings[-1].date_str))
+            changed |= copy_if_changed(last_agenda_path, self.path_util.get_output_path("agenda.html"))
 
         if update_member_info is True:
-            member_info_lib.dump()
-
-
-def __main__():
-    if len(sys.argv) == 3:
+            changed |= member_info_lib.dump()
+        changed |= build_cache.save()
+        return changed
+
+    def call_role_logs(self, from_date=None):
+        """
+        :return: (date_str, path) of every logged call role text on or after from_date, in date order
+        """
+        log_dir = self.path_util.get_log_path("")
+        logs = []
+        for file_name in os.listdir(log_dir):
+            m = re.match(r"^([0-9]{8})\.call_role\.txt$", file_name)
+            if m is not None and (from_date is None or m.group(1) >= from_date):
+                logs.append((m.group(1), path.join(log_dir, file_name)))
+        return sorted(logs)
+
+    def replay(self, from_date=None, member_info_path=None, auto_resolve_confidence=None):
+        """
+        Rebuild member records from the call role logs with a single library, re-applying every meeting on or after
+        from_date in date order and dumping the library once at the end.
+        """
+        member_info_lib = open_member_library(member_info_path, club=self.club,
+                                              auto_resolve_confidence=auto_resolve_confidence)
+        if from_date is not None:
+            member_info_lib.clear_records(from_date)
+
+        for date_str, call_role_path in self.call_role_logs(from_date):
+            with open(call_role_path, "r", encoding="utf-8") as call_role_file:
+                # every meeting of a multi-week call role text is logged under each meeting date
+                for meeting in self.iter_meetings(call_role_file, int(date_str[:4]), call_role_path, self.club):
+                    if meeting.date_str == date_str:
+                        member_info_lib.clear_records(meeting.date_str)
+                        meeting.parse_info(member_info_lib)
+                        print("replayed {}".format(meeting.date_str))
+                call_role_file.close()
+
+        member_info_lib.dump()
+
+
+def replay_main(args, auto_resolve_confidence=None):
+    parser = argparse.ArgumentParser(prog="toastmaster_generator.py replay")
+    parser.add_argument("--from", dest="from_date", help="first meeting date to re-apply, e.g. 20201104")
+    parser.add_argument("member_info_path", nargs="?", default=None)
+    options = parser.parse_args(args)
+    ToastmasterAgendaGenerator().replay(options.from_date, options.member_info_path, auto_resolve_confidence)
+
+
+def compact_main(args):
+    parser = argparse.ArgumentParser(prog="toastmaster_generator.py compact")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="copy members the journal did not touch from the member info file instead of re-encoding")
+    parser.add_argument("member_info_path", nargs="?", default=None)
+    options = parser.parse_args(args)
+    open_member_library(options.member_info_path).compact(options.changed_only)
+
+
+def generate_club(club_root, options: Dict[str, object]) -> bool:
+    """
+    Generate the agendas of the club at club_root in its shared context; top level, so process pools can run it.
+    """
+    club = ClubContext.default(club_root)
+    with club.lock:
+        return ToastmasterAgendaGenerator(club=club).generate_agenda(**options)
+
+
+def generate_clubs(club_roots: List[str], workers=None, processes=False, **options) -> Dict[str, bool]:
+    """
+    Generate the agendas of several clubs at once, each from its own directory with its own configs, templates and
+    member library.
+    :param processes: run the clubs on a process pool instead of threads
+    :param options: passed to generate_agenda; a relative call_role_path is taken from each club's directory
+    :return: club directory -> whether any of its files changed
+    """
+    club_roots = list(dict.fromkeys(path.abspath(club_root) for club_root in club_roots))
+    # the club workers are the only executor level, each renders its meetings itself
+    options["jobs"] = 1
+    executor = ProcessPoolExecutor(workers) if processes else ThreadPoolExecutor(workers)
+    with executor:
+        futures = {}
+        for club_root in club_roots:
+            club_options = dict(options)
+            call_role_path = club_options.get("call_role_path")
+            if call_role_path is not None and not path.isabs(call_role_path):
+                club_options["call_role_path"] = path.join(club_root, call_role_path)
+            futures[club_root] = executor.submit(generate_club, club_root, club_options)
+        return {club_root: future.result() for club_root, future in futures.items()}
+
+
+def clubs_main(args, auto_resolve_confidence=None):
+    parser = argparse.ArgumentParser(prog="toastmaster_generator.py clubs",
+                                     description="generate the agendas of several clubs concurrently")
+    parser.add_argument("club_roots", nargs="+", help="club directories, each with data/, config/ and templates/")
+    parser.add_argument("--call-role", dest="call_role_path", default=None,
+                        help="call role text relative to each club directory, data/meeting.txt by default")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--processes", action="store_true", help="use processes instead of threads")
+    options = parser.parse_args(args)
+    changes = generate_clubs(options.club_roots, options.workers, options.processes,
+                             call_role_path=options.call_role_path, update_member_info=True, log_agenda=True,
+                             auto_resolve_confidence=auto_resolve_confidence)
+    for club_root, changed in changes.items():
+        print("{}: {}".format(club_root, "updated" if changed else "unchanged"))
+
+
+def watch_main(args, auto_resolve_confidence=None):
+    parser = argparse.ArgumentParser(prog="toastmaster_generator.py watch",
+                                     description="regenerate the agendas whenever the call role text, configs or "
+                                                 "template change; member records are not saved")
+    parser.add_argument("call_role_path", nargs="?", default=None, help="data/meeting.txt by default")
+    parser.add_argument("--club", dest="club_root", default=None, help="club directory, the package one by default")
+    parser.add_argument("--member-info", dest="member_info_path", default=None)
+    parser.add_argument("--interval", type=float, default=0.2, help="seconds between polls")
+    options = parser.parse_args(args)
+    generator = ToastmasterAgendaGenerator(club=ClubContext.default(options.club_root))
+    try:
+        AgendaWatcher(generator, options.call_role_path, options.member_info_path,
+                      auto_resolve_confidence).run(options.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def run_command(auto_resolve_confidence=None):
+    if len(sys.argv) >= 2 and sys.argv[1] == "replay":
+        replay_main(sys.argv[2:], auto_resolve_confidence)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "recommend":
+        recommend_main(sys.argv[2:])
+    elif len(sys.argv) >= 2 and sys.argv[1] == "watch":
+        watch_main(sys.argv[2:], auto_resolve_confidence)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "clubs":
+        clubs_main(sys.argv[2:], auto_resolve_confidence)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "compact":
+        compact_main(sys.argv[2:])
+    elif len(sys.argv) == 3:
         _, current_log_path, call_role_path = sys.argv
         generator = ToastmasterAgendaGenerator()
-        generator.generate_agenda(call_role_path, current_log_path, update_member_info=True)
+        generator.generate_agenda(call_role_path, current_log_path, update_member_info=True,
+                                  auto_resolve_confidence=auto_resolve_confidence)
     elif len(sys.argv) == 1:
         generator = ToastmasterAgendaGenerator()
-        generator.generate_agenda(update_member_info=True, log_agenda=True)
-        # for root, _, files in os.walk(PathUtil().get_log_path("")):
-        #     files = sorted(filter(lambda x: x.endswith(".txt"), files))
-        #     for i, file in enumerate(files):
-        #         generator = ToastmasterAgendaGenerator(file[:4])
-        #
-        #         generator.generate_agenda(
-        #             call_role_path=path.join(root, file),
-        #             update_member_info=True,
-        #             log_agenda=(i == len(files)-1)
-        #         )
+        generator.generate_agenda(update_member_info=True, log_agenda=True,
+                                  auto_resolve_confidence=auto_resolve_confidence)
     else:
         git_token = sys.argv[1]
         generator = ToastmasterAgendaGenerator()
-        generator.generate_agenda(update_member_info=True)
+        if not generator.generate_agenda(update_member_info=True, auto_resolve_confidence=auto_resolve_confidence):
+            print("nothing changed")
+            return
 
         status = subprocess.check_output(["git", "status"]).decode("utf-8")
         print(status)
-        if status.find("data/member_info.json") is not -1:
+        if status.find("data/member_info.") is not -1:
             current_branch = subprocess.check_output(
                 ["git", "rev-parse", "--abbrev-ref", "HEAD"]).decode("utf-8").strip()
             subprocess.check_call(["git", "add", "."])
@@ -583,5 +877,30 @@ def __main__():
             print(run.stdout)
 
 
+def __main__():
+    # --profile[=trace.json] and --auto-resolve=CONFIDENCE work with every command and are taken out before the
+    # arguments are read; misspelled member names fail the run unless they resolve at CONFIDENCE, e.g. 0.8
+    trace_path = None
+    auto_resolve_confidence = None
+    for arg in list(sys.argv[1:]):
+        if arg == "--profile" or arg.startswith("--profile="):
+            sys.argv.remove(arg)
+            trace_path = arg.partition("=")[2] or PathUtil().get_output_path("profile.trace.json")
+        elif arg.startswith("--auto-resolve="):
+            sys.argv.remove(arg)
+            auto_resolve_confidence = float(arg.partition("=")[2])
+    if trace_path is None:
+        run_command(auto_resolve_confidence)
+        return
+
+    profiler.enable()
+    try:
+        with profiler.span("toastmaster_generator.py", {"argv": sys.argv[1:]}):
+            run_command(auto_resolve_confidence)
+    finally:
+        print(profiler.export(trace_path))
+        print("trace written to {}".format(trace_path))
+
+
 if __name__ == "__main__":
     __main__()
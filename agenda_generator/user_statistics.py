@@ -1,4 +1,7 @@
+import argparse
+import sys
 from member import MemberInfoLibrary, MemberInfo
+from member_statistics import MemberStatistics
 
 
 def init_mentor_relationship():
@@ -19,24 +22,36 @@ def init_mentor_relationship():
 
 
 def __main__():
-    init_mentor_relationship()
+    parser = argparse.ArgumentParser(description="role and speech counts of every member, as CSV or JSON")
+    parser.add_argument("--from", dest="since",
+                        help="first record date to count, e.g. 20200901; every record by default, speeches included")
+    parser.add_argument("--to", dest="until", help="last record date to count")
+    parser.add_argument("--group-by", default="member", choices=["member", "mentor", "level"])
+    parser.add_argument("--period", choices=["year", "month"], help="one row per group and period")
+    parser.add_argument("--format", default="csv", choices=["csv", "json"])
+    parser.add_argument("--output", help="file to write instead of stdout")
+    parser.add_argument("--check-counters", action="store_true",
+                        help="recount the saved per-member counters from the records and report any drift")
+    options = parser.parse_args()
+
     member_lib = MemberInfoLibrary()
-    rows = []
-    for user_name in [
-        "Bill", "Harper", "Pan", "Zhiwei",
-        "Bonnie", "Locke", "Madison", "Shuhan", "Davie",
-        "Davie", "Sawyer",
-        "Elliot", "Marrisa", "Eilleen",
-        "Harper", "Elliot",
-        "Nancy", "Bill",
-        "Raymond Lu", "Fengling", "Haoyu", "Joey", "Kay",
-        "TBD", "Annie Liu", "Bonnie", "Brenda", "Julia", "Nancy", "Raymond Lu", "Alicia"
-    ]:
-        rows.append(member_lib.find(user_name).to_statistics_row())
-    columns = list(rows[0])
-    for row in rows:
-        print(",".join(map(lambda x: str(row[x]), columns)))
+    if options.check_counters:
+        drift = member_lib.check_counters()
+        for line in drift:
+            print(line)
+        print("{} counter(s) drifted".format(len(drift)))
+        sys.exit(1 if len(drift) > 0 else 0)
+
+    statistics = MemberStatistics(member_lib)
+    rows = statistics.report(options.since, options.until, options.group_by, options.period)
+    out_file = sys.stdout if options.output is None else open(options.output, "w", encoding="utf-8", newline="")
+    if options.format == "csv":
+        statistics.write_csv(rows, out_file)
+    else:
+        statistics.write_json(rows, out_file)
+    if out_file is not sys.stdout:
+        out_file.close()
 
 
 if __name__ == "__main__":
-    __main__()
\ No newline at end of file
+    __main__()
@@ -0,0 +1,155 @@
+import os
+import time
+from os import path
+from typing import Dict, List, Optional, Tuple
+from agenda import Agenda
+from build_cache import BuildCache, copy_if_changed, digest_of
+from member_store import open_member_library
+from path_util import CONFIG_NAMES
+
+
+class AgendaWatcher:
+    """
+    Keeps a club's member library, configs and compiled templates warm and regenerates the agendas of a call role
+    text as soon as it, the configs, the template or the member info file change.
+
+    Meetings before the first changed block keep their role assignments, the others are parsed again, and only
+    agendas whose inputs or earlier member records changed are rendered again, to output/{date}.agenda.html, with
+    the last meeting also previewed in output/agenda.html. Member records are only updated in memory.
+    """
+    def __init__(self, generator, call_role_path=None, member_info_path=None, auto_resolve_confidence=None):
+        """
+        :param generator: the ToastmasterAgendaGenerator of the club, whose parser and paths are used
+        :param auto_resolve_confidence: see MemberInfoLibrary
+        """
+        self._generator = generator
+        self._club = generator.club
+        path_util = self._club.path_util
+        self._call_role_path = path_util.default_meeting_info_path if call_role_path is None else call_role_path
+        self._member_info_path = path_util.default_member_info_path if member_info_path is None \
+            else member_info_path
+        self._auto_resolve_confidence = auto_resolve_confidence
+        self._input_paths = [path_util.get_config_path(name) for name in CONFIG_NAMES] + \
+            [path_util.get_template("default.html")]
+        self._library_paths = [
+            self._member_info_path,
+            path.splitext(self._member_info_path)[0] + ".journal",
+            path_util.get_config_path("learning_path")
+        ]
+        # file path -> (modification time, size) when last polled successfully, None if missing
+        self._stamps = {}  # type: Dict[str, Optional[Tuple[int, int]]]
+        self._member_lib = None
+        self._inputs_digest = None  # type: Optional[str]
+        self._meetings = []  # type: list
+        # date -> (fingerprint, agenda) built right after the meeting was parsed
+        self._agendas = {}  # type: Dict[str, Tuple[str, Agenda]]
+        # date -> fingerprint of the agenda last rendered for it
+        self._rendered = {}  # type: Dict[str, str]
+
+    def _current_stamps(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        stamps = {}
+        for file_path in [self._call_role_path] + self._library_paths + self._input_paths:
+            try:
+                stat = os.stat(file_path)
+                stamps[file_path] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                stamps[file_path] = None
+        return stamps
+
+    def _first_changed(self, meetings: list) -> int:
+        """
+        :return: the index of the first meeting whose block differs from the last poll, len(meetings) if none does
+        """
+        dates = [meeting.date_str for meeting in meetings]
+        if dates != sorted(set(dates)):
+            # clearing from a meeting date only leaves the earlier meetings alone if dates increase
+            return 0
+        for i, meeting in enumerate(meetings):
+            if i >= len(self._meetings) or self._meetings[i].input_parts() != meeting.input_parts():
+                return i
+        return len(meetings)
+
+    def poll(self) -> List[str]:
+        """
+        Bring the agendas up to date with the files changed since the last poll.
+        :return: the agenda paths rewritten
+        """
+        stamps = self._current_stamps()
+        changed = [file_path for file_path, stamp in stamps.items()
+                   if file_path not in self._stamps or self._stamps[file_path] != stamp]
+        if len(changed) == 0:
+            return []
+        if self._member_lib is None or any(file_path in changed for file_path in self._library_paths):
+            self._member_lib = open_member_library(self._member_info_path, club=self._club,
+                                                   auto_resolve_confidence=self._auto_resolve_confidence)
+            self._meetings = []
+        if self._inputs_digest is None or any(file_path in changed for file_path in self._input_paths):
+            self._inputs_digest = BuildCache.files_digest(self._input_paths)
+            # roles and times shape the parse, so every meeting is parsed again with the new configs
+            self._meetings = []
+
+        with open(self._call_role_path, "r", encoding="utf-8") as call_role_file:
+            call_role_text = call_role_file.read()
+            call_role_file.close()
+        meetings = self._generator.read_info_from_call_role(
+            call_role_text, self._generator.call_role_year(self._call_role_path), self._call_role_path, self._club
+        )
+        first = self._first_changed(meetings)
+        try:
+            if first < len(self._meetings):
+                # records of a meeting dropped or moved to a later date
+                self._member_lib.clear_records(self._meetings[first].date_str)
+            for meeting in meetings[first:]:
+                self._member_lib.clear_records(meeting.date_str)
+                meeting.parse_info(self._member_lib)
+                # speech topics and levels are read off the members, which later meetings move on
+                fingerprint = digest_of([
+                    self._inputs_digest, meeting.input_parts(), meeting.earlier_records(self._member_lib)
+                ])
+                self._agendas[meeting.date_str] = (fingerprint, meeting.build_agenda())
+        except Exception:
+            # the library is half updated, reload it and retry the files, which keep their old stamps
+            self._member_lib = None
+            raise
+        self._meetings = self._meetings[:first] + meetings[first:]
+        written = self._render()
+        self._stamps = stamps
+        return written
+
+    def _render(self) -> List[str]:
+        path_util = self._club.path_util
+        written = []
+        for i, meeting in enumerate(self._meetings):
+            fingerprint, agenda = self._agendas[meeting.date_str]
+            agenda_path = path_util.get_output_path("{0}.agenda.html".format(meeting.date_str))
+            if self._rendered.get(meeting.date_str) != fingerprint or not os.path.exists(agenda_path):
+                if agenda.dump(agenda_path):
+                    written.append(agenda_path)
+                self._rendered[meeting.date_str] = fingerprint
+            if i == len(self._meetings) - 1:
+                preview_path = path_util.get_output_path("agenda.html")
+                if copy_if_changed(agenda_path, preview_path):
+                    written.append(preview_path)
+        return written
+
+    def run(self, interval=0.2):
+        print("watching {} for changes, Ctrl-C to stop".format(self._call_role_path), flush=True)
+        last_error = None
+        while True:
+            start = time.perf_counter()
+            try:
+                written = self.poll()
+                last_error = None
+            except Exception as e:
+                # failed polls are retried until the files are fixed, only report each error once
+                error = "{}: {}".format(type(e).__name__, e)
+                if error != last_error:
+                    print("not updated: {}".format(error), flush=True)
+                    last_error = error
+                written = []
+            if len(written) > 0:
+                print("{} updated in {:.0f} ms".format(
+                    ", ".join(os.path.basename(file_path) for file_path in written),
+                    (time.perf_counter() - start) * 1000
+                ), flush=True)
+            time.sleep(interval)